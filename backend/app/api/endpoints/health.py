@@ -3,19 +3,47 @@ Comprehensive health check endpoints for all system services.
 """
 
 import os
+import time
+import uuid
 import redis
 import asyncio
-from typing import Dict, Any, Optional
+import functools
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.core.redis import REDIS_POOL_OPTIONS, get_redis
 from app.services.openai_service import get_openai_service
 from app.services.lightrag_service import get_lightrag_service
 
 router = APIRouter()
 
+# Connection pool settings reported by the Redis health check
+_REDIS_POOL_CONFIG = {
+    "socket_keepalive": REDIS_POOL_OPTIONS["socket_keepalive"],
+    "health_check_interval": REDIS_POOL_OPTIONS["health_check_interval"]
+}
+
+# Threads for the Celery inspect broadcasts, kept apart from the default
+# executor that request handlers use
+_inspect_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="celery-inspect")
+
+# Last probe result per service, keyed by name:
+# (monotonic timestamp, argument key, response)
+_health_cache: Dict[str, Tuple[float, tuple, "ServiceHealthResponse"]] = {}
+
+# Last comprehensive report, and the probe round currently building one
+_report_cache: Optional[Tuple[float, "ComprehensiveHealthResponse"]] = None
+_report_inflight: Optional["asyncio.Future[ComprehensiveHealthResponse]"] = None
+
+# JSON body of the last report served by the endpoint, so cache hits skip
+# re-encoding it
+_report_body: Optional[Tuple["ComprehensiveHealthResponse", bytes]] = None
+
 
 class ServiceHealthResponse(BaseModel):
     """Individual service health response."""
@@ -34,25 +62,104 @@ class ComprehensiveHealthResponse(BaseModel):
     summary: Dict[str, int]
 
 
-async def check_redis_health() -> ServiceHealthResponse:
+def _cache_key(args: tuple, kwargs: Dict[str, Any]) -> tuple:
+    """Build the cache key for a probe's arguments.
+    
+    Clients count by the connection pool they draw from, so the per-request
+    clients that get_redis hands out over the shared pool share one entry.
+    """
+    def identity(value):
+        return getattr(value, "connection_pool", value)
+    
+    return (
+        tuple(identity(arg) for arg in args),
+        tuple(sorted((name, identity(value)) for name, value in kwargs.items()))
+    )
+
+
+def cached_health(service_name: str, ttl_seconds: Optional[float] = None):
+    """
+    Reuse a health probe's result for a short TTL.
+    
+    Load balancers and dashboards poll these endpoints frequently; caching
+    avoids a live ping/inspect/model-list round-trip on every request. Only
+    the latest result per service is kept, and it is reused only for calls
+    with the same arguments.
+    
+    Args:
+        service_name: Cache entry for the probe
+        ttl_seconds: Cache lifetime; defaults to settings.HEALTH_CHECK_CACHE_TTL
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> ServiceHealthResponse:
+            ttl = settings.HEALTH_CHECK_CACHE_TTL if ttl_seconds is None else ttl_seconds
+            now = time.monotonic()
+            key = _cache_key(args, kwargs)
+            
+            cached = _health_cache.get(service_name)
+            if ttl > 0 and cached is not None and cached[1] == key and now - cached[0] < ttl:
+                return cached[2]
+            
+            result = await func(*args, **kwargs)
+            if ttl > 0:
+                _health_cache[service_name] = (now, key, result)
+            return result
+        
+        wrapper.cache_clear = lambda: _health_cache.pop(service_name, None)
+        return wrapper
+    
+    return decorator
+
+
+def clear_health_cache() -> None:
+    """Drop every cached probe result, the cached comprehensive report and
+    any probe round still in flight."""
+    global _report_cache, _report_inflight, _report_body
+    
+    _health_cache.clear()
+    _report_cache = None
+    _report_inflight = None
+    _report_body = None
+
+
+@cached_health("redis")
+async def check_redis_health(redis_client: Optional[redis.Redis] = None) -> ServiceHealthResponse:
     """Check Redis connectivity and status."""
     start_time = datetime.utcnow()
     
     try:
-        # Parse Redis URL
-        redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-        
-        # Test basic connectivity
-        ping_result = redis_client.ping()
-        
-        # Get Redis info
-        info = redis_client.info()
-        
-        # Test set/get operations
-        test_key = "health_check_test"
-        redis_client.set(test_key, "test_value", ex=60)  # Expire in 60 seconds
-        test_value = redis_client.get(test_key)
-        redis_client.delete(test_key)
+        if redis_client is None:
+            redis_client = get_redis()
+        
+        def probe():
+            # Ping, server info and a set/get/delete check in a single round trip
+            test_key = "health_check_test"
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.ping()
+            pipe.info()
+            pipe.set(test_key, "test_value", ex=60)  # Expire in 60 seconds
+            pipe.get(test_key)
+            pipe.delete(test_key)
+            ping_result, info, _, test_value, _ = pipe.execute()
+            return ping_result, info, test_value
+        
+        # The client is blocking; run it off the loop so the other
+        # comprehensive_health probes can proceed meanwhile
+        ping_result, info, test_value = await asyncio.to_thread(probe)
+        
+        # The pool may or may not decode responses
+        if test_value not in ("test_value", b"test_value"):
+            return ServiceHealthResponse(
+                service="redis",
+                status="unhealthy",
+                details={
+                    "error": "Test operations failed",
+                    "message": f"Read back {test_value!r} instead of the value just written",
+                    "config": _REDIS_POOL_CONFIG
+                },
+                timestamp=datetime.utcnow()
+            )
         
         response_time = (datetime.utcnow() - start_time).total_seconds() * 1000
         
@@ -65,7 +172,8 @@ async def check_redis_health() -> ServiceHealthResponse:
                 "connected_clients": info.get("connected_clients", 0),
                 "used_memory_human": info.get("used_memory_human", "unknown"),
                 "uptime_in_seconds": info.get("uptime_in_seconds", 0),
-                "test_operations": "passed"
+                "test_operations": "passed",
+                "config": _REDIS_POOL_CONFIG
             },
             timestamp=datetime.utcnow(),
             response_time_ms=response_time
@@ -78,7 +186,8 @@ async def check_redis_health() -> ServiceHealthResponse:
             details={
                 "error": "Connection failed",
                 "message": str(e),
-                "redis_url": settings.REDIS_URL.split('@')[-1] if '@' in settings.REDIS_URL else settings.REDIS_URL
+                "redis_url": settings.REDIS_URL.split('@')[-1] if '@' in settings.REDIS_URL else settings.REDIS_URL,
+                "config": _REDIS_POOL_CONFIG
             },
             timestamp=datetime.utcnow()
         )
@@ -94,6 +203,7 @@ async def check_redis_health() -> ServiceHealthResponse:
         )
 
 
+@cached_health("celery")
 async def check_celery_health() -> ServiceHealthResponse:
     """Check Celery worker status."""
     start_time = datetime.utcnow()
@@ -101,11 +211,15 @@ async def check_celery_health() -> ServiceHealthResponse:
     try:
         from app.core.celery_app import celery_app
         
-        # Get active workers
+        # Get active workers; each inspect call is a blocking broker broadcast
+        # waiting on worker replies, so the three run side by side
         inspect = celery_app.control.inspect()
-        active_workers = inspect.active()
-        registered_tasks = inspect.registered()
-        stats = inspect.stats()
+        loop = asyncio.get_running_loop()
+        active_workers, registered_tasks, stats = await asyncio.gather(
+            loop.run_in_executor(_inspect_executor, inspect.active),
+            loop.run_in_executor(_inspect_executor, inspect.registered),
+            loop.run_in_executor(_inspect_executor, inspect.stats)
+        )
         
         if not active_workers:
             return ServiceHealthResponse(
@@ -123,7 +237,7 @@ async def check_celery_health() -> ServiceHealthResponse:
         try:
             from app.tasks.maintenance import ping_task
             result = ping_task.delay()
-            task_result = result.get(timeout=5)  # Wait up to 5 seconds
+            task_result = await asyncio.to_thread(result.get, timeout=5)  # Wait up to 5 seconds
             task_test_passed = task_result == "pong"
         except Exception as task_error:
             task_test_passed = False
@@ -173,6 +287,7 @@ async def check_celery_health() -> ServiceHealthResponse:
         )
 
 
+@cached_health("lightrag")
 async def check_lightrag_health() -> ServiceHealthResponse:
     """Check LightRAG functionality."""
     start_time = datetime.utcnow()
@@ -243,6 +358,36 @@ async def check_lightrag_health() -> ServiceHealthResponse:
         )
 
 
+@functools.lru_cache(maxsize=None)
+def _cuda_status() -> Tuple[bool, Optional[str]]:
+    """
+    CUDA availability and version for GPU acceleration.
+    
+    The driver query is fixed for the life of the process, so it runs once
+    rather than on every health poll.
+    """
+    try:
+        import torch
+    except ImportError:
+        return False, None
+    
+    if torch.cuda.is_available():
+        return True, torch.version.cuda
+    return False, None
+
+
+@functools.lru_cache(maxsize=None)
+def _has_spec(name: str) -> bool:
+    """
+    Whether a top-level package is installed.
+    
+    Installed packages do not change while the process runs, so the import
+    system is searched once per name rather than on every health poll.
+    """
+    return importlib.util.find_spec(name) is not None
+
+
+@cached_health("raganything_mineru")
 async def check_raganything_mineru_health() -> ServiceHealthResponse:
     """Check RAG-Anything and MinerU availability."""
     start_time = datetime.utcnow()
@@ -250,6 +395,8 @@ async def check_raganything_mineru_health() -> ServiceHealthResponse:
     try:
         # Test RAG-Anything import
         try:
+            if not _has_spec("raganything"):
+                raise ImportError("No module named 'raganything'")
             import raganything
             raganything_version = getattr(raganything, '__version__', 'unknown')
         except ImportError as e:
@@ -259,6 +406,7 @@ async def check_raganything_mineru_health() -> ServiceHealthResponse:
                 details={
                     "error": "RAG-Anything not installed",
                     "message": str(e),
+                    "raganything_available": False,
                     "suggestion": "Install RAG-Anything with: pip install raganything"
                 },
                 timestamp=datetime.utcnow()
@@ -266,6 +414,8 @@ async def check_raganything_mineru_health() -> ServiceHealthResponse:
         
         # Test MinerU integration
         try:
+            if not _has_spec("mineru"):
+                raise ImportError("No module named 'mineru'")
             from raganything.parser import MineruParser
             mineru_available = True
             mineru_error = None
@@ -274,15 +424,7 @@ async def check_raganything_mineru_health() -> ServiceHealthResponse:
             mineru_error = str(e)
         
         # Check CUDA availability for GPU acceleration
-        cuda_available = False
-        cuda_version = None
-        try:
-            import torch
-            cuda_available = torch.cuda.is_available()
-            if cuda_available:
-                cuda_version = torch.version.cuda
-        except ImportError:
-            pass
+        cuda_available, cuda_version = _cuda_status()
         
         # Check MinerU configuration file
         config_file = "backend/magic-pdf.json"
@@ -314,6 +456,7 @@ async def check_raganything_mineru_health() -> ServiceHealthResponse:
             service="raganything_mineru",
             status=status,
             details={
+                "raganything_available": True,
                 "raganything_version": raganything_version,
                 "mineru_available": mineru_available,
                 "mineru_error": mineru_error,
@@ -341,6 +484,7 @@ async def check_raganything_mineru_health() -> ServiceHealthResponse:
         )
 
 
+@cached_health("openai")
 async def check_openai_health() -> ServiceHealthResponse:
     """Check OpenAI API validation."""
     start_time = datetime.utcnow()
@@ -386,6 +530,69 @@ async def check_openai_health() -> ServiceHealthResponse:
         )
 
 
+def _probe_directory(dir_path: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Check that a storage directory exists, is writable and round-trips a file.
+    
+    Returns:
+        The directory's health details and whether it is healthy
+    """
+    try:
+        # Check if directory exists
+        exists = os.path.exists(dir_path)
+        
+        # Check if directory is writable
+        writable = os.access(dir_path, os.W_OK) if exists else False
+        
+        # Try to create directory if it doesn't exist
+        if not exists:
+            os.makedirs(dir_path, exist_ok=True)
+            exists = os.path.exists(dir_path)
+            writable = os.access(dir_path, os.W_OK)
+        
+        # Test write operation; the name is unique because directories that
+        # share a path are probed at the same time
+        test_file = os.path.join(dir_path, f".health_check_test_{uuid.uuid4().hex}")
+        write_test_passed = False
+        try:
+            with open(test_file, 'w') as f:
+                f.write("health_check")
+            with open(test_file, 'r') as f:
+                content = f.read()
+            os.remove(test_file)
+            write_test_passed = content == "health_check"
+        except Exception:
+            write_test_passed = False
+        
+        # Get directory size info in a single walk
+        total_size = 0
+        file_count = 0
+        try:
+            for dirpath, dirnames, filenames in os.walk(dir_path):
+                file_count += len(filenames)
+                total_size += sum(
+                    os.path.getsize(os.path.join(dirpath, filename))
+                    for filename in filenames
+                )
+        except Exception:
+            total_size = 0
+            file_count = 0
+        
+        check = {
+            "path": dir_path,
+            "exists": exists,
+            "writable": writable,
+            "write_test_passed": write_test_passed,
+            "total_size_bytes": total_size,
+            "file_count": file_count
+        }
+        return check, exists and writable and write_test_passed
+        
+    except Exception as e:
+        return {"path": dir_path, "error": str(e)}, False
+
+
+@cached_health("storage")
 async def check_storage_health() -> ServiceHealthResponse:
     """Check storage accessibility."""
     start_time = datetime.utcnow()
@@ -402,65 +609,15 @@ async def check_storage_health() -> ServiceHealthResponse:
             "chroma_db_path": settings.CHROMA_DB_PATH
         }
         
-        for dir_name, dir_path in directories.items():
-            try:
-                # Check if directory exists
-                exists = os.path.exists(dir_path)
-                
-                # Check if directory is writable
-                writable = os.access(dir_path, os.W_OK) if exists else False
-                
-                # Try to create directory if it doesn't exist
-                if not exists:
-                    os.makedirs(dir_path, exist_ok=True)
-                    exists = os.path.exists(dir_path)
-                    writable = os.access(dir_path, os.W_OK)
-                
-                # Test write operation
-                test_file = os.path.join(dir_path, ".health_check_test")
-                write_test_passed = False
-                try:
-                    with open(test_file, 'w') as f:
-                        f.write("health_check")
-                    with open(test_file, 'r') as f:
-                        content = f.read()
-                    os.remove(test_file)
-                    write_test_passed = content == "health_check"
-                except Exception:
-                    write_test_passed = False
-                
-                # Get directory size info
-                try:
-                    total_size = sum(
-                        os.path.getsize(os.path.join(dirpath, filename))
-                        for dirpath, dirnames, filenames in os.walk(dir_path)
-                        for filename in filenames
-                    )
-                    file_count = sum(
-                        len(filenames)
-                        for dirpath, dirnames, filenames in os.walk(dir_path)
-                    )
-                except Exception:
-                    total_size = 0
-                    file_count = 0
-                
-                storage_checks[dir_name] = {
-                    "path": dir_path,
-                    "exists": exists,
-                    "writable": writable,
-                    "write_test_passed": write_test_passed,
-                    "total_size_bytes": total_size,
-                    "file_count": file_count
-                }
-                
-                if not (exists and writable and write_test_passed):
-                    overall_healthy = False
-                    
-            except Exception as e:
-                storage_checks[dir_name] = {
-                    "path": dir_path,
-                    "error": str(e)
-                }
+        # Directories are probed in parallel worker threads so the blocking
+        # disk I/O stays off the event loop
+        probes = await asyncio.gather(
+            *(asyncio.to_thread(_probe_directory, dir_path) for dir_path in directories.values())
+        )
+        
+        for dir_name, (check, healthy) in zip(directories, probes):
+            storage_checks[dir_name] = check
+            if not healthy:
                 overall_healthy = False
         
         # Check database file
@@ -511,9 +668,9 @@ async def check_storage_health() -> ServiceHealthResponse:
 
 
 @router.get("/health/redis", response_model=ServiceHealthResponse)
-async def redis_health():
+async def redis_health(redis_client: redis.Redis = Depends(get_redis)):
     """Redis connectivity health check."""
-    return await check_redis_health()
+    return await check_redis_health(redis_client)
 
 
 @router.get("/health/celery", response_model=ServiceHealthResponse)
@@ -546,19 +703,34 @@ async def storage_health():
     return await check_storage_health()
 
 
-@router.get("/health/comprehensive", response_model=ComprehensiveHealthResponse)
-async def comprehensive_health():
-    """Comprehensive health check for all services with enhanced error monitoring."""
+async def _bounded(service_name: str, check) -> ServiceHealthResponse:
+    """Await a health check, reporting it unhealthy once HEALTH_CHECK_TIMEOUT passes."""
+    try:
+        return await asyncio.wait_for(check, timeout=settings.HEALTH_CHECK_TIMEOUT)
+    except asyncio.TimeoutError:
+        return ServiceHealthResponse(
+            service=service_name,
+            status="unhealthy",
+            details={
+                "error": "timeout",
+                "timeout_seconds": settings.HEALTH_CHECK_TIMEOUT
+            },
+            timestamp=datetime.utcnow()
+        )
+
+
+async def _run_comprehensive_health() -> ComprehensiveHealthResponse:
+    """Probe every service and build the comprehensive report."""
     start_time = datetime.utcnow()
     
     # Run all health checks concurrently
     health_checks = await asyncio.gather(
-        check_redis_health(),
-        check_celery_health(),
-        check_lightrag_health(),
-        check_raganything_mineru_health(),
-        check_openai_health(),
-        check_storage_health(),
+        _bounded("redis", check_redis_health()),
+        _bounded("celery", check_celery_health()),
+        _bounded("lightrag", check_lightrag_health()),
+        _bounded("raganything_mineru", check_raganything_mineru_health()),
+        _bounded("openai", check_openai_health()),
+        _bounded("storage", check_storage_health()),
         return_exceptions=True
     )
     
@@ -635,6 +807,48 @@ async def comprehensive_health():
     )
 
 
+async def _refresh_report() -> ComprehensiveHealthResponse:
+    """Run one probe round and cache its report while the TTL allows."""
+    global _report_cache
+    
+    report = await _run_comprehensive_health()
+    if settings.HEALTH_CHECK_CACHE_TTL > 0:
+        _report_cache = (time.monotonic(), report)
+    return report
+
+
+async def comprehensive_health() -> ComprehensiveHealthResponse:
+    """Comprehensive health check for all services with enhanced error monitoring."""
+    global _report_inflight
+    
+    ttl = settings.HEALTH_CHECK_CACHE_TTL
+    if ttl > 0 and _report_cache is not None and time.monotonic() - _report_cache[0] < ttl:
+        return _report_cache[1]
+    
+    # Single flight: requests arriving mid-probe await the round in progress
+    # instead of starting their own; shield keeps one caller's cancellation
+    # from cancelling it for the rest
+    if _report_inflight is None or _report_inflight.done():
+        _report_inflight = asyncio.ensure_future(_refresh_report())
+    return await asyncio.shield(_report_inflight)
+
+
+# The body is pre-encoded, so the model only documents the response schema
+@router.get(
+    "/health/comprehensive",
+    response_class=Response,
+    responses={200: {"model": ComprehensiveHealthResponse}}
+)
+async def comprehensive_health_endpoint() -> Response:
+    """Comprehensive health check, reusing the JSON body while the report is cached."""
+    global _report_body
+    
+    report = await comprehensive_health()
+    if _report_body is None or _report_body[0] is not report:
+        _report_body = (report, report.model_dump_json().encode())
+    return Response(content=_report_body[1], media_type="application/json")
+
+
 @router.get("/health/errors")
 async def error_monitoring_status():
     """Get error monitoring and alerting status."""
@@ -65,6 +65,10 @@ celery_app.conf.update(
             "task": "app.tasks.maintenance.health_check",
             "schedule": 300.0,  # Every 5 minutes
         },
+        "recover-stuck-documents": {
+            "task": "app.tasks.maintenance.recover_stuck_documents",
+            "schedule": 600.0,  # Every 10 minutes
+        },
     },
 )
 
@@ -54,6 +54,10 @@ class Settings(BaseSettings):
     MINERU_BACKEND: str = "pipeline"
     MINERU_LANG: str = "en"
     
+    # Health checks
+    HEALTH_CHECK_CACHE_TTL: float = 2.0  # seconds; 0 disables caching
+    HEALTH_CHECK_TIMEOUT: float = 3.0  # seconds per service in the comprehensive check
+    
     # Logging
     LOG_LEVEL: str = "INFO"
     
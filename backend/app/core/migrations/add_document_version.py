@@ -0,0 +1,41 @@
+"""
+Add stuck-document recovery version column to documents migration.
+"""
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+def upgrade():
+    """Add documents.version column."""
+    with engine.connect() as conn:
+        # Databases created after the model change already have the column
+        columns = [row[1] for row in conn.execute(text("PRAGMA table_info(documents)"))]
+        if "version" in columns:
+            print("✅ documents.version column already present")
+            return
+
+        conn.execute(text("""
+            ALTER TABLE documents
+            ADD COLUMN version INTEGER NOT NULL DEFAULT 0
+        """))
+
+        conn.commit()
+        print("✅ documents.version column added successfully")
+
+
+def downgrade():
+    """Remove documents.version column."""
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE documents DROP COLUMN version"))
+        conn.commit()
+        print("✅ documents.version column removed successfully")
+
+
+def run_migration():
+    """Run the migration."""
+    upgrade()
+
+
+if __name__ == "__main__":
+    upgrade()
@@ -0,0 +1,40 @@
+"""
+Shared Redis connection pool.
+"""
+
+import socket
+
+import redis
+
+from app.core.config import settings
+
+# Probe idle connections so half-open sockets are dropped before they are
+# reused, instead of hanging the first command after a quiet period.
+# TCP_KEEPIDLE and friends are not available on every platform.
+SOCKET_KEEPALIVE_OPTIONS = {
+    option: value
+    for option, value in (
+        (getattr(socket, "TCP_KEEPIDLE", None), 30),
+        (getattr(socket, "TCP_KEEPINTVL", None), 10),
+        (getattr(socket, "TCP_KEEPCNT", None), 3),
+    )
+    if option is not None
+}
+
+REDIS_POOL_OPTIONS = {
+    "socket_keepalive": True,
+    "socket_keepalive_options": SOCKET_KEEPALIVE_OPTIONS,
+    "health_check_interval": 30,  # seconds
+}
+
+# One pool per process so health checks and services reuse connections
+redis_pool = redis.ConnectionPool.from_url(
+    settings.REDIS_URL,
+    decode_responses=True,
+    **REDIS_POOL_OPTIONS
+)
+
+
+def get_redis() -> redis.Redis:
+    """Get a Redis client backed by the shared connection pool."""
+    return redis.Redis(connection_pool=redis_pool)
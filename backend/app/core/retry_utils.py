@@ -24,6 +24,7 @@ class RetryConfig:
     def __init__(
         self,
         max_retries: int = 3,
+        base_delay: float = 1.0,
         backoff_factor: float = 1.5,
         max_backoff: float = 60.0,
         jitter: bool = True,
@@ -31,6 +32,7 @@ class RetryConfig:
         retryable_exceptions: Optional[List[Type[Exception]]] = None
     ):
         self.max_retries = max_retries
+        self.base_delay = base_delay
         self.backoff_factor = backoff_factor
         self.max_backoff = max_backoff
         self.jitter = jitter
@@ -163,6 +165,7 @@ def retry_with_backoff(
                     # Calculate delay
                     delay = calculate_backoff_delay(
                         attempt=attempt,
+                        base_delay=config.base_delay,
                         backoff_factor=config.backoff_factor,
                         max_backoff=config.max_backoff,
                         jitter=config.jitter,
@@ -180,7 +183,7 @@ def retry_with_backoff(
                         error=str(e)
                     )
                     
-                    # Wait before retry
+                    # Wait before retry without blocking other tasks on the loop
                     await asyncio.sleep(delay)
             
             # All retries exhausted
@@ -235,6 +238,7 @@ def retry_with_backoff(
                     # Calculate delay
                     delay = calculate_backoff_delay(
                         attempt=attempt,
+                        base_delay=config.base_delay,
                         backoff_factor=config.backoff_factor,
                         max_backoff=config.max_backoff,
                         jitter=config.jitter,
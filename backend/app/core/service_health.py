@@ -9,11 +9,11 @@ from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
-import redis
 import structlog
 
 from app.core.config import settings
 from app.core.exceptions import ExternalServiceError, ConfigurationError
+from app.core.redis import get_redis
 
 logger = structlog.get_logger(__name__)
 
@@ -130,8 +130,8 @@ class ServiceHealthMonitor:
         start_time = time.time()
         
         try:
-            # Create Redis connection
-            redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            # Reuse the shared connection pool
+            redis_client = get_redis()
             
             # Test basic operations
             test_key = "health_check_test"
@@ -59,6 +59,8 @@ class Document(Base):
     task_id = Column(String(100), nullable=True, index=True)
     extracted_text = Column(Text, nullable=True)
     doc_metadata = Column(JSON, nullable=False, default=dict)
+    # Bumped only by the stuck-document recovery compare-and-set
+    version = Column(Integer, nullable=False, default=0)
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
     
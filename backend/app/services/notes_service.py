@@ -541,6 +541,9 @@ class NotesService:
             source_words = set(source_note.content.lower().split())
             source_title_words = set(source_note.title.lower().split())
             
+            # Existing links only depend on the source note, so extract them once
+            existing_links = [link.lower() for link in self._extract_wiki_links(source_note.content)]
+            
             for note in other_notes:
                 # Calculate content similarity
                 note_words = set(note.content.lower().split())
@@ -560,8 +563,8 @@ class NotesService:
                 combined_similarity = (content_similarity * 0.3) + (title_similarity * 0.7)
                 
                 # Check if already linked
-                existing_links = self._extract_wiki_links(source_note.content)
-                already_linked = any(note.title.lower() in link.lower() for link in existing_links)
+                note_title_lower = note.title.lower()
+                already_linked = any(note_title_lower in link for link in existing_links)
                 
                 if combined_similarity > 0.1 and not already_linked:  # Minimum threshold
                     suggestions.append({
@@ -5,7 +5,7 @@ This service handles OpenAI API integration, connectivity testing, and fallback
 
 import os
 import asyncio
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 from openai import OpenAI, AsyncOpenAI
 from openai.types.chat import ChatCompletion
 from openai.types import CreateEmbeddingResponse
@@ -26,6 +26,7 @@ class OpenAIService:
         self._base_url: Optional[str] = None
         self._is_available: bool = False
         self._last_test_result: Optional[Dict[str, Any]] = None
+        self._client_config: Optional[Tuple[str, Optional[str]]] = None
     
     def configure(self, 
                   api_key: Optional[str] = None, 
@@ -59,6 +60,12 @@ class OpenAIService:
                 self._is_available = False
                 return False
             
+            # Keep the existing clients, and their warm connection pools, when
+            # reconfigured with the same credentials
+            if (self.async_client is not None
+                    and self._client_config == (self._api_key, self._base_url)):
+                return True
+            
             # Initialize clients
             client_kwargs = {"api_key": self._api_key}
             if self._base_url:
@@ -66,6 +73,7 @@ class OpenAIService:
             
             self.client = OpenAI(**client_kwargs)
             self.async_client = AsyncOpenAI(**client_kwargs)
+            self._client_config = (self._api_key, self._base_url)
             
             logger.info(f"OpenAI client configured with base_url: {self._base_url or 'default'}")
             return True
@@ -104,7 +104,8 @@ def update_document_status(document_id: str, status: str, error: Optional[str] =
         db.close()
 
 
-@celery_app.task(bind=True, name="app.tasks.document_processing.process_document")
+# Tracks STARTED so that the stuck-document sweep can treat PENDING as lost
+@celery_app.task(bind=True, name="app.tasks.document_processing.process_document", track_started=True)
 def process_document_task(self, document_id: str, file_path: str) -> Dict[str, Any]:
     """
     Background task for processing uploaded documents with RAG-Anything.
@@ -4,16 +4,23 @@ Maintenance and monitoring Celery tasks.
 
 import time
 from datetime import datetime, timedelta
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 import logging
 
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
 from app.core.celery_app import celery_app
 from app.core.database import SessionLocal, DatabaseManager
 from app.core.vector_db import vector_db
-from app.models.database import BackgroundTask, SearchHistory
+from app.models.database import BackgroundTask, Document, SearchHistory
 
 logger = logging.getLogger(__name__)
 
+# Documents untouched in "processing" for longer than the processing task's
+# time limit are candidates for recovery
+STUCK_DOCUMENT_AGE = timedelta(minutes=30)
+
 
 @celery_app.task(name="app.tasks.maintenance.ping_task")
 def ping_task() -> str:
@@ -237,4 +244,110 @@ def database_maintenance() -> Dict[str, Any]:
     except Exception as e:
         error_msg = str(e)
         logger.error(f"Database maintenance failed: {error_msg}")
-        raise
\ No newline at end of file
+        raise
+
+
+def requeue_stuck_documents(db: Session, stuck_after: timedelta = STUCK_DOCUMENT_AGE) -> List[Tuple[str, str]]:
+    """
+    Reset documents left in "processing" by a Celery task that no longer exists.
+    
+    Each reset is a compare-and-set on documents.version, so several reapers
+    can run at once without locking rows. A document whose version changed
+    since it was read belongs to whoever changed it and is skipped. The caller
+    owns the transaction and commits it.
+    
+    Args:
+        db: Session the documents are read and updated through
+        stuck_after: How long a document must have been unchanged
+        
+    Returns:
+        (document_id, file_path) of every document moved back to "queued"
+    """
+    cutoff_time = datetime.utcnow() - stuck_after
+    candidates = db.execute(
+        select(Document.id, Document.file_path, Document.task_id, Document.version)
+        .where(
+            Document.processing_status == "processing",
+            Document.task_id.isnot(None),
+            Document.updated_at < cutoff_time
+        )
+    ).all()
+    
+    requeued = []
+    for document in candidates:
+        # process_document_task tracks STARTED, so PENDING means its task
+        # is unknown to the result backend
+        if celery_app.AsyncResult(document.task_id).state != "PENDING":
+            continue
+        
+        result = db.execute(
+            update(Document)
+            .where(Document.id == document.id, Document.version == document.version)
+            .values(
+                processing_status="queued",
+                version=Document.version + 1,
+                updated_at=datetime.utcnow()
+            )
+        )
+        if result.rowcount != 1:
+            logger.info(f"Stuck document {document.id} was changed by another worker, skipping")
+            continue
+        
+        logger.warning(f"Requeued document {document.id} stuck in processing (stale task {document.task_id})")
+        requeued.append((document.id, document.file_path))
+    
+    return requeued
+
+
+@celery_app.task(name="app.tasks.maintenance.recover_stuck_documents")
+def recover_stuck_documents() -> Dict[str, Any]:
+    """
+    Requeue and redispatch documents whose processing task was lost.
+    
+    Returns:
+        Dict containing recovery results
+    """
+    from app.tasks.document_processing import process_document_task
+    
+    try:
+        db = SessionLocal()
+        try:
+            requeued = requeue_stuck_documents(db)
+            db.commit()
+            
+            dispatched = []
+            failed = []
+            for document_id, file_path in requeued:
+                try:
+                    task = process_document_task.delay(document_id, file_path)
+                except Exception as e:
+                    # The sweep only looks at "processing" rows, so hand the
+                    # document back to it instead of leaving it queued behind
+                    # a task that will never run
+                    logger.error(f"Failed to redispatch stuck document {document_id}: {e}")
+                    values = {"processing_status": "processing", "version": Document.version + 1}
+                    failed.append(document_id)
+                else:
+                    values = {"task_id": task.id}
+                    dispatched.append(document_id)
+                
+                db.execute(
+                    update(Document)
+                    .where(Document.id == document_id, Document.processing_status == "queued")
+                    .values(**values)
+                )
+            db.commit()
+            
+        finally:
+            db.close()
+        
+        return {
+            "status": "completed",
+            "requeued_documents": dispatched,
+            "failed_dispatches": failed
+        }
+        
+    except Exception as e:
+        error_msg = str(e)
+        logger.error(f"Stuck document recovery failed: {error_msg}")
+        raise
@@ -15,7 +15,7 @@ Usage:
 Options:
     --category CATEGORY    Run specific test category (unit, integration, error, dependencies, load, all)
     --verbose             Enable verbose output
-    --coverage            Generate coverage report
+    --coverage            Generate coverage report (fails under 80%)
     --html-report         Generate HTML test report
     --parallel            Run tests in parallel (requires pytest-xdist)
     --quick               Run quick tests only (skip slow tests)
@@ -88,7 +88,7 @@ class ComprehensiveTestRunner:
             cmd.append("-v")
         
         if options.get("coverage"):
-            cmd.extend(["--cov=app", "--cov-report=term-missing"])
+            cmd.extend(["--cov=app", "--cov-report=term-missing", "--cov-fail-under=80"])
             if options.get("html_report"):
                 cmd.append(f"--cov-report=html:{self.output_dir}/coverage_html")
         
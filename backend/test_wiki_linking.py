@@ -3,8 +3,13 @@ Test script for wiki-style linking functionality.
 """
 
 import asyncio
+import contextvars
+import io
+import logging
 import sys
 import os
+import uuid
+from typing import Optional
 
 # Add the app directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
@@ -13,20 +18,50 @@ from app.models.schemas import NoteCreate
 from app.services.notes_service import notes_service
 from app.core.database import DatabaseManager
 
+logger = logging.getLogger(__name__)
+
+# Upper bound on tests running at once in main()
+MAX_CONCURRENT_TESTS = 4
+
+
+# Output buffer of the test task running in the current context, if any
+_task_output: contextvars.ContextVar[Optional[io.StringIO]] = contextvars.ContextVar(
+    "_task_output", default=None
+)
+
+
+class _TaskStdout(io.TextIOBase):
+    """sys.stdout proxy sending each test task's prints to its own buffer."""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return (_task_output.get() or self._stream).write(text)
+    
+    def flush(self):
+        self._stream.flush()
+
+
+def _unique_suffix() -> str:
+    """Short suffix keeping note titles distinct when tests run concurrently."""
+    return uuid.uuid4().hex[:6]
+
 
 async def test_bidirectional_links():
     """Test bidirectional link creation."""
     print("🧪 Testing Bidirectional Link Creation...")
     
     try:
-        # Initialize database
-        db_manager = DatabaseManager()
-        db_manager.init_database()
+        suffix = _unique_suffix()
         
         # Create a note with wiki links to non-existent notes
         note_data = NoteCreate(
-            title="Main Note",
-            content="# Main Note\n\nThis note links to [[Concept A]] and [[Concept B]].\n\nIt also mentions [[Important Topic]].",
+            title=f"Main Note {suffix}",
+            content=(
+                f"# Main Note\n\nThis note links to [[Concept A {suffix}]] and [[Concept B {suffix}]].\n\n"
+                f"It also mentions [[Important Topic {suffix}]]."
+            ),
             tags=["main"]
         )
         
@@ -58,8 +93,7 @@ async def test_bidirectional_links():
         
     except Exception as e:
         print(f"❌ Bidirectional link test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Bidirectional link test failed")
         return False
 
 
@@ -68,34 +102,36 @@ async def test_link_suggestions():
     print("\n🧪 Testing Link Suggestions...")
     
     try:
+        suffix = _unique_suffix()
+        
         # Create several notes with related content
         notes_data = [
             NoteCreate(
-                title="Machine Learning",
+                title=f"Machine Learning {suffix}",
                 content="# Machine Learning\n\nMachine learning is a subset of artificial intelligence that focuses on algorithms and data.",
                 tags=["ai", "ml"]
             ),
             NoteCreate(
-                title="Deep Learning",
+                title=f"Deep Learning {suffix}",
                 content="# Deep Learning\n\nDeep learning uses neural networks with multiple layers to learn from data.",
                 tags=["ai", "ml", "deep"]
             ),
             NoteCreate(
-                title="Neural Networks",
+                title=f"Neural Networks {suffix}",
                 content="# Neural Networks\n\nNeural networks are computing systems inspired by biological neural networks.",
                 tags=["ai", "networks"]
             ),
             NoteCreate(
-                title="Data Science",
+                title=f"Data Science {suffix}",
                 content="# Data Science\n\nData science combines statistics, programming, and domain expertise to extract insights from data.",
                 tags=["data", "science"]
             )
         ]
         
-        created_notes = []
-        for note_data in notes_data:
-            note = await notes_service.create_note(note_data)
-            created_notes.append(note)
+        created_notes = await asyncio.gather(
+            *(notes_service.create_note(note_data) for note_data in notes_data)
+        )
+        for note in created_notes:
             print(f"✅ Created note: {note.title}")
         
         # Test link suggestions for the first note
@@ -108,16 +144,14 @@ async def test_link_suggestions():
         assert len(suggestions) > 0, "Should have at least one suggestion"
         
         # Clean up
-        for note in created_notes:
-            await notes_service.delete_note(note.id)
+        await asyncio.gather(*(notes_service.delete_note(note.id) for note in created_notes))
         
         print("🎉 Link suggestions test passed!")
         return True
         
     except Exception as e:
         print(f"❌ Link suggestions test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Link suggestions test failed")
         return False
 
 
@@ -126,9 +160,12 @@ async def test_comprehensive_link_validation():
     print("\n🧪 Testing Comprehensive Link Validation...")
     
     try:
+        suffix = _unique_suffix()
+        target_a = f"Target Note A {suffix}"
+        
         # Create target notes
         target_notes = []
-        for title in ["Target Note A", "Target Note B"]:
+        for title in [target_a, f"Target Note B {suffix}"]:
             note_data = NoteCreate(
                 title=title,
                 content=f"# {title}\n\nThis is a target note.",
@@ -140,15 +177,15 @@ async def test_comprehensive_link_validation():
         
         # Create a note with various types of links
         test_note_data = NoteCreate(
-            title="Test Note with Links",
-            content="""# Test Note with Links
+            title=f"Test Note with Links {suffix}",
+            content=f"""# Test Note with Links
 
 This note has several types of links:
 
-1. Valid exact link: [[Target Note A]]
+1. Valid exact link: [[{target_a}]]
 2. Valid partial link: [[Target Note]]  
-3. Broken link: [[Non-existent Note]]
-4. Another broken link: [[Missing Note]]
+3. Broken link: [[Non-existent Note {suffix}]]
+4. Another broken link: [[Missing Note {suffix}]]
 """,
             tags=["test"]
         )
@@ -179,8 +216,7 @@ This note has several types of links:
         
     except Exception as e:
         print(f"❌ Link validation test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Link validation test failed")
         return False
 
 
@@ -189,32 +225,37 @@ async def test_auto_linking():
     print("\n🧪 Testing Automatic Content Linking...")
     
     try:
+        suffix = _unique_suffix()
+        python_title = f"Python Programming {suffix}"
+        ml_title = f"Machine Learning {suffix}"
+        analysis_title = f"Data Analysis {suffix}"
+        
         # Create target notes
-        target_notes = []
-        target_titles = ["Python Programming", "Machine Learning", "Data Analysis"]
+        target_titles = [python_title, ml_title, analysis_title]
         
-        for title in target_titles:
-            note_data = NoteCreate(
+        target_notes = await asyncio.gather(*(
+            notes_service.create_note(NoteCreate(
                 title=title,
                 content=f"# {title}\n\nThis is about {title.lower()}.",
                 tags=["target"]
-            )
-            note = await notes_service.create_note(note_data)
-            target_notes.append(note)
+            ))
+            for title in target_titles
+        ))
+        for note in target_notes:
             print(f"✅ Created target note: {note.title}")
         
         # Create a note that mentions these topics without links
         source_note_data = NoteCreate(
-            title="My Learning Journey",
-            content="""# My Learning Journey
+            title=f"My Learning Journey {suffix}",
+            content=f"""# My Learning Journey
 
-I started learning Python Programming last year. It was challenging at first, but I gradually got better.
+I started learning {python_title} last year. It was challenging at first, but I gradually got better.
 
-Then I moved on to Machine Learning, which opened up a whole new world of possibilities.
+Then I moved on to {ml_title}, which opened up a whole new world of possibilities.
 
-Now I'm focusing on Data Analysis to better understand the data I work with.
+Now I'm focusing on {analysis_title} to better understand the data I work with.
 
-Python Programming has been the foundation for everything else I've learned.
+{python_title} has been the foundation for everything else I've learned.
 """,
             tags=["journey"]
         )
@@ -239,17 +280,17 @@ Python Programming has been the foundation for everything else I've learned.
         print(f"✅ Updated note now has {len(wiki_links['outgoing_links'])} outgoing links")
         
         # Clean up
-        await notes_service.delete_note(source_note.id)
-        for note in target_notes:
-            await notes_service.delete_note(note.id)
+        await asyncio.gather(
+            notes_service.delete_note(source_note.id),
+            *(notes_service.delete_note(note.id) for note in target_notes)
+        )
         
         print("🎉 Auto-linking test passed!")
         return True
         
     except Exception as e:
         print(f"❌ Auto-linking test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Auto-linking test failed")
         return False
 
 
@@ -264,10 +305,34 @@ async def main():
         test_auto_linking
     ]
     
-    results = []
-    for test in tests:
-        result = await test()
-        results.append(result)
+    # Initialize database once before the tests start writing notes
+    DatabaseManager().init_database()
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_TESTS)
+    
+    async def run_test(test):
+        async with semaphore:
+            # Each task runs in its own context copy, so this buffer is private
+            output = io.StringIO()
+            _task_output.set(output)
+            try:
+                return await test()
+            except Exception:
+                return False
+            finally:
+                # Emit the whole block at once so concurrent tests don't interleave
+                _task_output.set(None)
+                print(output.getvalue(), end="")
+    
+    # Each test uses uniquely suffixed titles, so they can run concurrently
+    stdout = sys.stdout
+    sys.stdout = _TaskStdout(stdout)
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(run_test(test)) for test in tests]
+    finally:
+        sys.stdout = stdout
+    results = [task.result() is True for task in tasks]
     
     if all(results):
         print("\n🎉 All wiki linking tests completed successfully!")
@@ -278,5 +343,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Block-buffer progress output and flush once instead of per print()
+    sys.stdout.reconfigure(line_buffering=False)
     success = asyncio.run(main())
+    sys.stdout.flush()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -2,30 +2,41 @@
 Test script for wiki-style linking API endpoints.
 """
 
+import asyncio
+import logging
 import sys
 import os
 
 # Add the app directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'app'))
 
-from fastapi.testclient import TestClient
+from httpx import ASGITransport, AsyncClient
 from app.main import app
 from app.core.database import DatabaseManager
 
+logger = logging.getLogger(__name__)
 
-def test_wiki_linking_api():
+
+_client = None
+
+
+def _get_client() -> AsyncClient:
+    """Return the shared test client, initializing the database on first use."""
+    global _client
+    if _client is None:
+        print("📊 Initializing database...")
+        DatabaseManager().init_database()
+        print("✅ Database initialized")
+        _client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    return _client
+
+
+async def test_wiki_linking_api():
     """Test wiki linking API endpoints."""
     print("🧪 Testing Wiki Linking API Endpoints...")
     
     try:
-        # Initialize database
-        print("📊 Initializing database...")
-        db_manager = DatabaseManager()
-        db_manager.init_database()
-        print("✅ Database initialized")
-        
-        # Create test client
-        client = TestClient(app)
+        client = _get_client()
         
         # Test 1: Create notes with wiki links
         print("\n1️⃣ Creating notes with wiki links...")
@@ -35,7 +46,7 @@ def test_wiki_linking_api():
             "tags": ["main"]
         }
         
-        response = client.post("/api/v1/notes/", json=main_note_data)
+        response = await client.post("/api/v1/notes/", json=main_note_data)
         assert response.status_code == 201
         main_note = response.json()
         main_note_id = main_note["id"]
@@ -43,7 +54,7 @@ def test_wiki_linking_api():
         
         # Test 2: Create bidirectional links
         print("\n2️⃣ Testing bidirectional link creation...")
-        response = client.post(f"/api/v1/notes/{main_note_id}/links/create-bidirectional")
+        response = await client.post(f"/api/v1/notes/{main_note_id}/links/create-bidirectional")
         assert response.status_code == 200
         bidirectional_result = response.json()
         print(f"✅ Created {len(bidirectional_result['created_notes'])} bidirectional links")
@@ -52,14 +63,14 @@ def test_wiki_linking_api():
         
         # Test 3: Get link suggestions
         print("\n3️⃣ Testing link suggestions...")
-        response = client.get(f"/api/v1/notes/{main_note_id}/links/suggestions?limit=5")
+        response = await client.get(f"/api/v1/notes/{main_note_id}/links/suggestions?limit=5")
         assert response.status_code == 200
         suggestions = response.json()
         print(f"✅ Got {len(suggestions['suggestions'])} link suggestions")
         
         # Test 4: Comprehensive link validation
         print("\n4️⃣ Testing comprehensive link validation...")
-        response = client.post(f"/api/v1/notes/{main_note_id}/links/validate-all")
+        response = await client.post(f"/api/v1/notes/{main_note_id}/links/validate-all")
         assert response.status_code == 200
         validation = response.json()
         print(f"✅ Link validation completed:")
@@ -75,14 +86,14 @@ def test_wiki_linking_api():
             "tags": ["journey"]
         }
         
-        response = client.post("/api/v1/notes/", json=source_note_data)
+        response = await client.post("/api/v1/notes/", json=source_note_data)
         assert response.status_code == 201
         source_note = response.json()
         source_note_id = source_note["id"]
         print(f"✅ Created source note: {source_note_id}")
         
         # Test auto-linking
-        response = client.post(f"/api/v1/notes/{source_note_id}/links/auto-link?min_similarity=0.8")
+        response = await client.post(f"/api/v1/notes/{source_note_id}/links/auto-link?min_similarity=0.8")
         assert response.status_code == 200
         auto_link_result = response.json()
         print(f"✅ Auto-linking added {auto_link_result['total_links_added']} links")
@@ -90,17 +101,18 @@ def test_wiki_linking_api():
         # Test 6: Get backlinks
         print("\n6️⃣ Testing backlinks...")
         if created_note_ids:
-            response = client.get(f"/api/v1/notes/{created_note_ids[0]}/backlinks")
+            response = await client.get(f"/api/v1/notes/{created_note_ids[0]}/backlinks")
             assert response.status_code == 200
             backlinks = response.json()
             print(f"✅ Found {len(backlinks['backlinks'])} backlinks")
         
         # Clean up
         print("\n🧹 Cleaning up...")
-        client.delete(f"/api/v1/notes/{main_note_id}")
-        client.delete(f"/api/v1/notes/{source_note_id}")
-        for note_id in created_note_ids:
-            client.delete(f"/api/v1/notes/{note_id}")
+        cleanup_urls = [
+            f"/api/v1/notes/{note_id}"
+            for note_id in [main_note_id, source_note_id, *created_note_ids]
+        ]
+        await asyncio.gather(*(client.delete(url) for url in cleanup_urls))
         print("✅ Cleanup completed")
         
         print("\n🎉 All wiki linking API tests passed!")
@@ -108,33 +120,32 @@ def test_wiki_linking_api():
         
     except Exception as e:
         print(f"\n❌ Wiki linking API test failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Wiki linking API test failed")
         return False
 
 
-def test_error_handling():
+async def test_error_handling():
     """Test error handling for wiki linking endpoints."""
     print("\n🧪 Testing Wiki Linking API Error Handling...")
     
     try:
-        client = TestClient(app)
+        client = _get_client()
         
         # Test 1: Non-existent note
         print("\n1️⃣ Testing 404 errors...")
-        response = client.post("/api/v1/notes/non-existent-id/links/create-bidirectional")
+        response = await client.post("/api/v1/notes/non-existent-id/links/create-bidirectional")
         assert response.status_code == 404
         print("✅ 404 error handled correctly for bidirectional links")
         
-        response = client.get("/api/v1/notes/non-existent-id/links/suggestions")
+        response = await client.get("/api/v1/notes/non-existent-id/links/suggestions")
         assert response.status_code == 404
         print("✅ 404 error handled correctly for link suggestions")
         
-        response = client.post("/api/v1/notes/non-existent-id/links/validate-all")
+        response = await client.post("/api/v1/notes/non-existent-id/links/validate-all")
         assert response.status_code == 404
         print("✅ 404 error handled correctly for link validation")
         
-        response = client.post("/api/v1/notes/non-existent-id/links/auto-link")
+        response = await client.post("/api/v1/notes/non-existent-id/links/auto-link")
         assert response.status_code == 404
         print("✅ 404 error handled correctly for auto-linking")
         
@@ -146,22 +157,22 @@ def test_error_handling():
             "content": "Test content",
             "tags": []
         }
-        response = client.post("/api/v1/notes/", json=note_data)
+        response = await client.post("/api/v1/notes/", json=note_data)
         assert response.status_code == 201
         note_id = response.json()["id"]
         
         # Test invalid limit parameter
-        response = client.get(f"/api/v1/notes/{note_id}/links/suggestions?limit=0")
+        response = await client.get(f"/api/v1/notes/{note_id}/links/suggestions?limit=0")
         assert response.status_code == 422
         print("✅ Validation error handled correctly for invalid limit")
         
         # Test invalid similarity parameter
-        response = client.post(f"/api/v1/notes/{note_id}/links/auto-link?min_similarity=2.0")
+        response = await client.post(f"/api/v1/notes/{note_id}/links/auto-link?min_similarity=2.0")
         assert response.status_code == 422
         print("✅ Validation error handled correctly for invalid similarity")
         
         # Clean up
-        client.delete(f"/api/v1/notes/{note_id}")
+        await client.delete(f"/api/v1/notes/{note_id}")
         
         print("\n🎉 Error handling tests passed!")
         return True
@@ -171,15 +182,19 @@ def test_error_handling():
         return False
 
 
-def main():
+async def main():
     """Run all wiki linking API tests."""
     print("🚀 Starting Wiki Linking API Tests\n")
     
-    # Test main functionality
-    api_success = test_wiki_linking_api()
-    
-    # Test error handling
-    error_success = test_error_handling()
+    try:
+        # Test main functionality
+        api_success = await test_wiki_linking_api()
+        
+        # Test error handling
+        error_success = await test_error_handling()
+    finally:
+        if _client is not None:
+            await _client.aclose()
     
     if api_success and error_success:
         print("\n🎉 All wiki linking API tests completed successfully!")
@@ -190,5 +205,8 @@ def main():
 
 
 if __name__ == "__main__":
-    success = main()
+    # Block-buffer progress output and flush once instead of per print()
+    sys.stdout.reconfigure(line_buffering=False)
+    success = asyncio.run(main())
+    sys.stdout.flush()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -7,11 +7,24 @@ including test database setup, mock services, and test data.
 
 import os
 import sys
-import pytest
 import asyncio
-import tempfile
+import copy
 import shutil
+import tempfile
+import functools
+import json
+import time
+import uuid
+import pytest
+import psutil
+import fakeredis
+import redis
+from fakeredis._commands import command
+from fakeredis._fakesocket import FakeSocket
+from collections.abc import Mapping
+from contextlib import ExitStack
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Any, Generator, AsyncGenerator
 from unittest.mock import Mock, AsyncMock, patch
 
@@ -19,33 +32,318 @@ from unittest.mock import Mock, AsyncMock, patch
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.core.config import settings
-from app.core.database import get_db, engine
-from app.models.database import Base
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from app.core.database import get_db
+from app.core.redis import get_redis
+from app.models.database import Base, Document
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import CreateIndex, CreateTable
 from fastapi.testclient import TestClient
-from app.main import app
+from httpx import ASGITransport, AsyncClient
+from pytest_asyncio import is_async_test
+
+
+# Schema DDL compiled once for SQLite and replayed by every test engine
+_SQLITE_DIALECT = sqlite.dialect()
+TEST_SCHEMA_DDL = [
+    str(CreateTable(table).compile(dialect=_SQLITE_DIALECT))
+    for table in Base.metadata.sorted_tables
+] + [
+    str(CreateIndex(index).compile(dialect=_SQLITE_DIALECT))
+    for table in Base.metadata.sorted_tables
+    for index in table.indexes
+]
+
+# Mock configurations are built once at import and applied to a fresh mock
+# per test via ``configure_mock``. Each test still gets its own child mocks,
+# so side effects set by one test never leak into the next.
+REDIS_MOCK_CONFIG = {
+    "ping.return_value": True,
+    "info.return_value": {"redis_version": "7.0.0"},
+    "get.return_value": None,
+    "set.return_value": True,
+    "delete.return_value": 1,
+    # Health probe pipeline: ping, info, set, get, delete
+    "pipeline.return_value.execute.return_value": [True, {"redis_version": "7.0.0"}, True, "test_value", 1]
+}
+
+CELERY_MOCK_CONFIG = {
+    "control.inspect.return_value.active.return_value": {"worker1": []},
+    "control.inspect.return_value.registered.return_value": {"worker1": ["app.tasks.process_document"]}
+}
+
+LIGHTRAG_MOCK_CONFIG = {
+    "is_initialized.return_value": True
+}
+
+LIGHTRAG_QUERY_RESPONSE = {
+    "answer": "Test answer",
+    "sources": [],
+    "entities": [],
+    "relationships": []
+}
+
+OPENAI_MOCK_CONFIG = {
+    "models.list.return_value.data": [
+        Mock(id="gpt-4o-mini"),
+        Mock(id="text-embedding-3-large")
+    ]
+}
+
+# Overrides applied when a mock fixture is parametrized with "fail"
+REDIS_FAILURE_CONFIG = {
+    "ping.side_effect": Exception("Redis connection failed"),
+    "pipeline.return_value.execute.side_effect": Exception("Redis connection failed")
+}
+
+CELERY_FAILURE_CONFIG = {
+    "control.inspect.side_effect": Exception("Celery connection failed")
+}
+
+OPENAI_FAILURE_CONFIG = {
+    "models.list.side_effect": Exception("OpenAI API unavailable")
+}
+
+RAGANYTHING_MOCK_CONFIG = {
+    "return_value": {
+        "extracted_text": "Test extracted text",
+        "metadata": {"pages": 1, "format": "text"},
+        "entities": ["AI", "ML"],
+        "success": True
+    }
+}
+
+
+# Read-only sample document row; use mutable_sample_document_data to modify
+SAMPLE_DOCUMENT_DATA = MappingProxyType({
+    "filename": "test_document.txt",
+    "file_type": "text/plain",
+    "file_size": 1024,
+    "extracted_text": "This is test content",
+    "processing_status": "completed",
+    "doc_metadata": {"pages": 1}
+})
+
+
+# Common test queries for search and RAG testing
+TEST_QUERIES = (
+    "artificial intelligence",
+    "machine learning algorithms",
+    "knowledge graph construction",
+    "semantic search functionality",
+    "document processing pipeline"
+)
+
+LOAD_TEST_CONFIG = MappingProxyType({
+    "concurrent_uploads": 10,
+    "test_duration": 60,  # seconds
+    "max_file_size": 1024 * 1024,  # 1MB
+    "timeout": 30  # seconds
+})
+
+TEST_JSON_PAYLOAD = {"test": "data", "entities": ["AI", "ML", "RAG"]}
+
+# Shared test file names and contents, keyed by file kind
+TEST_FILE_CONTENTS = {
+    "text": ("test_document.txt", """
+        This is a test document for the AI PKM Tool.
+        
+        It contains information about artificial intelligence, machine learning, and knowledge management.
+        
+        Key concepts:
+        - Natural Language Processing (NLP)
+        - Large Language Models (LLMs)
+        - Retrieval Augmented Generation (RAG)
+        - Knowledge Graphs
+        - Vector Embeddings
+        """),
+    "markdown": ("test_notes.md", """
+# Test Notes
+
+## Overview
+This is a test markdown document.
+
+## Features
+- Document Processing
+- Knowledge Graph
+- Semantic Search
+        """),
+    "json": ("test_data.json", json.dumps(TEST_JSON_PAYLOAD))
+}
+
+# Contents encoded once so files are written in binary mode
+_TEST_FILE_BYTES = {
+    kind: content.encode('utf-8') for kind, (_, content) in TEST_FILE_CONTENTS.items()
+}
+
+
+class LazyTestFiles(Mapping):
+    """Mapping of file kind to path that writes each file on first access."""
+    
+    def __init__(self, directory: str):
+        self._directory = directory
+        self._paths: Dict[str, str] = {}
+    
+    def __getitem__(self, kind: str) -> str:
+        if kind not in self._paths:
+            filename, _ = TEST_FILE_CONTENTS[kind]
+            file_path = os.path.join(self._directory, filename)
+            with open(file_path, 'wb') as f:
+                f.write(_TEST_FILE_BYTES[kind])
+            self._paths[kind] = file_path
+        return self._paths[kind]
+    
+    __call__ = __getitem__
+    
+    def __iter__(self):
+        return iter(TEST_FILE_CONTENTS)
+    
+    def __len__(self) -> int:
+        return len(TEST_FILE_CONTENTS)
+
+
+def pytest_configure(config):
+    """Give each pytest-xdist worker its own on-disk RAG and ChromaDB stores.
+    
+    The vector database and LightRAG singletons are created when test modules
+    are imported, so the paths are set here, before collection.
+    """
+    worker_id = getattr(config, "workerinput", {}).get("workerid", "master")
+    storage_dir = Path(tempfile.mkdtemp(prefix=f"pkm_storage_{worker_id}_"))
+    config.pkm_storage_dir = storage_dir
+    
+    settings.RAG_STORAGE_DIR = str(storage_dir / "rag_storage")
+    settings.CHROMA_DB_PATH = str(storage_dir / "chroma_db")
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on the session event loop.
+    
+    ``asyncio_default_fixture_loop_scope`` only covers fixtures; tests
+    would otherwise each get a fresh loop, and could not share the
+    session-scoped async clients.
+    """
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
 
 
 @pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+async def session_event_loop():
+    """The event loop every async test and fixture of the session runs on."""
+    return asyncio.get_running_loop()
+
+
+@pytest.fixture(autouse=True)
+def restore_event_loop(session_event_loop):
+    """Reinstall the session loop as the thread's current loop around each test.
+    
+    DocumentProcessor's sync bridges install and close their own loops, which
+    would leave a closed loop current for the async tests that follow.
+    """
+    asyncio.set_event_loop(session_event_loop)
+    yield
+    asyncio.set_event_loop(session_event_loop)
+
+
+def pytest_unconfigure(config):
+    """Remove the worker's RAG and ChromaDB stores."""
+    storage_dir = getattr(config, "pkm_storage_dir", None)
+    if storage_dir is not None:
+        shutil.rmtree(storage_dir, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _test_settings(tmp_path_factory):
+    """Apply test-wide settings once for the session and restore them after."""
+    data_dir = tmp_path_factory.mktemp("pkm_data")
+    overrides = {
+        "UPLOAD_DIR": str(data_dir / "uploads"),
+        "PROCESSED_DIR": str(data_dir / "processed"),
+        # Keep the suite offline; services fall back to their local modes
+        "OPENAI_API_KEY": None,
+        "OPENAI_BASE_URL": None,
+    }
+    originals = {name: getattr(settings, name) for name in overrides}
+    
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    
+    yield settings
+    
+    for name, value in originals.items():
+        setattr(settings, name, value)
+
+
+@pytest.fixture(autouse=True)
+def fresh_health_cache():
+    """Start every test without health probe results cached by earlier tests."""
+    from app.api.endpoints.health import clear_health_cache
+    
+    clear_health_cache()
+    yield
+    clear_health_cache()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def celery_in_memory():
+    """Run Celery tasks eagerly against in-memory transports for the session."""
+    from app.core.celery_app import celery_app
+    
+    overrides = {
+        "task_always_eager": True,
+        "task_eager_propagates": True,
+        "broker_url": "memory://",
+        "result_backend": "cache+memory://",
+    }
+    originals = {name: celery_app.conf.get(name) for name in overrides}
+    
+    celery_app.conf.update(**overrides)
+    
+    yield celery_app
+    
+    celery_app.conf.update(**originals)
 
 
 @pytest.fixture(scope="session")
-def test_db_engine():
+def test_db_engine(request):
     """Create a test database engine."""
-    # Use in-memory SQLite for tests
+    # pytest-xdist workers each get their own named in-memory database
+    worker_id = getattr(request.config, "workerinput", {}).get("workerid", "master")
+    
+    # Use in-memory SQLite for tests; StaticPool keeps a single connection so
+    # every thread and session sees the same database.
     test_engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False}
+        f"sqlite:///file:pkm_test_{worker_id}?mode=memory&cache=shared&uri=true",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
     )
     
-    # Create all tables
-    Base.metadata.create_all(bind=test_engine)
+    # pysqlite does not emit BEGIN itself, which breaks SAVEPOINT handling;
+    # take over transaction control so per-test rollbacks are reliable.
+    @event.listens_for(test_engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    # Test data is throwaway: keep the journal in memory and skip fsync
+    @event.listens_for(test_engine, "connect")
+    def _set_test_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+    
+    @event.listens_for(test_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+    
+    # Create all tables from the pre-compiled DDL
+    with test_engine.begin() as conn:
+        for statement in TEST_SCHEMA_DDL:
+            conn.exec_driver_sql(statement)
     
     yield test_engine
     
@@ -53,25 +351,53 @@ def test_db_engine():
     Base.metadata.drop_all(bind=test_engine)
 
 
+@pytest.fixture(scope="session")
+def test_session_factory(test_db_engine):
+    """Create the thread-scoped session registry shared by all tests."""
+    return scoped_session(sessionmaker(autocommit=False, autoflush=False))
+
+
 @pytest.fixture(scope="function")
-def test_db_session(test_db_engine):
-    """Create a test database session."""
-    TestingSessionLocal = sessionmaker(
-        autocommit=False, 
-        autoflush=False, 
-        bind=test_db_engine
-    )
+def test_db_session(test_db_engine, test_session_factory):
+    """Create a test database session rolled back after each test."""
+    connection = test_db_engine.connect()
+    transaction = connection.begin()
     
-    session = TestingSessionLocal()
+    # Commits inside the test only release a SAVEPOINT; the outer
+    # transaction is rolled back so every test starts from an empty database.
+    session = test_session_factory(
+        bind=connection,
+        join_transaction_mode="create_savepoint"
+    )
     
     try:
         yield session
     finally:
-        session.close()
+        test_session_factory.remove()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture(scope="session")
+def app_client():
+    """Create the test client and run app startup once for the whole session."""
+    # Imported here so collecting tests that never use HTTP skips app setup
+    from app.main import app
+    
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+async def async_app_client(app_client):
+    """Create the async HTTP client shared by the whole session."""
+    # Requests run in-process on the event loop, without the sync portal
+    async with AsyncClient(transport=ASGITransport(app=app_client.app), base_url="http://test") as client:
+        yield client
 
 
 @pytest.fixture(scope="function")
-def test_client(test_db_session):
+def test_client(app_client, test_db_session):
     """Create a test client with database dependency override."""
     def override_get_db():
         try:
@@ -79,90 +405,134 @@ def test_client(test_db_session):
         finally:
             pass
     
-    app.dependency_overrides[get_db] = override_get_db
+    app_client.app.dependency_overrides[get_db] = override_get_db
     
-    with TestClient(app) as client:
-        yield client
+    yield app_client
     
     # Clean up
-    app.dependency_overrides.clear()
+    app_client.app.dependency_overrides.pop(get_db, None)
 
 
-@pytest.fixture(scope="function")
-def temp_dir():
-    """Create a temporary directory for test files."""
-    temp_path = tempfile.mkdtemp(prefix="pkm_test_")
-    yield temp_path
-    shutil.rmtree(temp_path, ignore_errors=True)
+class _InfoFakeSocket(FakeSocket):
+    """fakeredis socket that also answers INFO, which fakeredis lacks."""
+    
+    @command((), (bytes,))
+    def info(self, *sections):
+        return b"# Server\r\nredis_version:7.0.0\r\n"
+
+
+class _InfoFakeConnection(fakeredis.FakeConnection):
+    """fakeredis connection whose socket answers INFO, pipelined or not."""
+    
+    def _connect(self) -> FakeSocket:
+        if not self._server.connected:
+            raise redis.ConnectionError("FakeRedis is emulating a connection error.")
+        return _InfoFakeSocket(self._server, db=self.db, lua_modules=self._lua_modules)
+
+
+@pytest.fixture(scope="session")
+def fake_redis_pool():
+    """Create one fakeredis-backed connection pool shared by the whole session."""
+    return redis.ConnectionPool(
+        connection_class=_InfoFakeConnection,
+        server=fakeredis.FakeServer(),
+        decode_responses=True
+    )
 
 
 @pytest.fixture(scope="function")
-def test_files(temp_dir):
-    """Create test files for document processing tests."""
-    files = {}
-    
-    # Text file
-    text_file = os.path.join(temp_dir, "test_document.txt")
-    with open(text_file, 'w', encoding='utf-8') as f:
-        f.write("""
-        This is a test document for the AI PKM Tool.
-        
-        It contains information about artificial intelligence, machine learning, and knowledge management.
-        
-        Key concepts:
-        - Natural Language Processing (NLP)
-        - Large Language Models (LLMs)
-        - Retrieval Augmented Generation (RAG)
-        - Knowledge Graphs
-        - Vector Embeddings
-        """)
-    files['text'] = text_file
+def fake_redis(app_client, fake_redis_pool):
+    """Serve the get_redis dependency from the shared fakeredis pool."""
+    client = redis.Redis(connection_pool=fake_redis_pool)
+    app_client.app.dependency_overrides[get_redis] = lambda: client
     
-    # Markdown file
-    md_file = os.path.join(temp_dir, "test_notes.md")
-    with open(md_file, 'w', encoding='utf-8') as f:
-        f.write("""
-# Test Notes
+    yield client
+    
+    app_client.app.dependency_overrides.pop(get_redis, None)
 
-## Overview
-This is a test markdown document.
 
-## Features
-- Document Processing
-- Knowledge Graph
-- Semantic Search
-        """)
-    files['markdown'] = md_file
+@pytest.fixture(scope="function")
+def async_client(async_app_client, test_client):
+    """Create an async HTTP client with the database dependency override."""
+    return async_app_client
+
+
+@pytest.fixture(scope="function")
+def temp_dir(tmp_path):
+    """Create a per-test temporary directory that tests may write into."""
+    return str(tmp_path)
+
+
+@pytest.fixture(scope="session")
+def test_files_dir(tmp_path_factory):
+    """Create the read-only directory holding shared test files."""
+    return str(tmp_path_factory.mktemp("pkm_test"))
+
+
+@pytest.fixture(scope="session")
+def test_files(test_files_dir):
+    """Create test files for document processing tests, each on first use."""
+    return LazyTestFiles(test_files_dir)
+
+
+@pytest.fixture(scope="session")
+def test_file_bytes():
+    """Contents of the shared test files, keyed like test_files."""
+    return MappingProxyType(_TEST_FILE_BYTES)
+
+
+@pytest.fixture(scope="session")
+def processor(session_event_loop):
+    """Document processor shared by the whole session.
+    
+    Tests replace its methods with function-scoped patches only, so state
+    never carries over between tests.
+    """
+    from app.services.document_processor import DocumentProcessor
     
-    # JSON file
-    json_file = os.path.join(temp_dir, "test_data.json")
-    with open(json_file, 'w', encoding='utf-8') as f:
-        f.write('{"test": "data", "entities": ["AI", "ML", "RAG"]}')
-    files['json'] = json_file
+    document_processor = DocumentProcessor()
+    # The constructor's sync bridge installs and closes its own loop; put the
+    # session loop back so the async tests that follow can still run
+    asyncio.set_event_loop(session_event_loop)
+    return document_processor
+
+
+def _mock_config(request, config: Dict[str, Any], failure_config: Dict[str, Any]) -> Dict[str, Any]:
+    """Select the mock configuration for an optionally parametrized mock fixture.
     
-    return files
+    Tests opt into failure behaviour with
+    ``@pytest.mark.parametrize("mock_redis", ["fail"], indirect=True)``.
+    """
+    if getattr(request, "param", "ok") == "fail":
+        return {**config, **failure_config}
+    return config
+
+
+def _new_lightrag_mock() -> Mock:
+    """Build a fresh LightRAG service instance mock."""
+    # Only the coroutine methods are async mocks; an AsyncMock root would
+    # turn every attribute (including is_initialized) into a coroutine.
+    return Mock(
+        query=AsyncMock(return_value=LIGHTRAG_QUERY_RESPONSE),
+        insert=AsyncMock(return_value=True),
+        insert_document=AsyncMock(return_value=True),
+        **LIGHTRAG_MOCK_CONFIG
+    )
 
 
 @pytest.fixture(scope="function")
-def mock_redis():
+def mock_redis(request, monkeypatch):
     """Mock Redis client for testing."""
-    with patch('redis.Redis') as mock_redis_class:
-        mock_redis_instance = Mock()
-        mock_redis_instance.ping.return_value = True
-        mock_redis_instance.info.return_value = {"redis_version": "7.0.0"}
-        mock_redis_instance.get.return_value = None
-        mock_redis_instance.set.return_value = True
-        mock_redis_instance.delete.return_value = 1
-        mock_redis_class.return_value = mock_redis_instance
-        yield mock_redis_instance
+    mock_redis_instance = Mock(**_mock_config(request, REDIS_MOCK_CONFIG, REDIS_FAILURE_CONFIG))
+    monkeypatch.setattr('redis.Redis', lambda *args, **kwargs: mock_redis_instance)
+    return mock_redis_instance
 
 
 @pytest.fixture(scope="function")
-def mock_celery():
+def mock_celery(request):
     """Mock Celery app for testing."""
     with patch('app.core.celery_app.celery_app') as mock_celery_app:
-        mock_celery_app.control.inspect.return_value.active.return_value = {"worker1": []}
-        mock_celery_app.control.inspect.return_value.registered.return_value = {"worker1": ["app.tasks.process_document"]}
+        mock_celery_app.configure_mock(**_mock_config(request, CELERY_MOCK_CONFIG, CELERY_FAILURE_CONFIG))
         yield mock_celery_app
 
 
@@ -170,112 +540,106 @@ def mock_celery():
 def mock_lightrag():
     """Mock LightRAG service for testing."""
     with patch('app.services.lightrag_service.LightRAGService') as mock_lightrag_class:
-        mock_lightrag_instance = AsyncMock()
-        mock_lightrag_instance.is_initialized.return_value = True
-        mock_lightrag_instance.query.return_value = {
-            "answer": "Test answer",
-            "sources": [],
-            "entities": [],
-            "relationships": []
-        }
+        mock_lightrag_instance = _new_lightrag_mock()
         mock_lightrag_class.return_value = mock_lightrag_instance
         yield mock_lightrag_instance
 
 
 @pytest.fixture(scope="function")
-def mock_openai():
+def mock_openai(request, monkeypatch):
     """Mock OpenAI client for testing."""
-    with patch('openai.OpenAI') as mock_openai_class:
-        mock_client = Mock()
-        mock_client.models.list.return_value.data = [
-            Mock(id="gpt-4o-mini"),
-            Mock(id="text-embedding-3-large")
-        ]
-        mock_openai_class.return_value = mock_client
-        yield mock_client
+    mock_client = Mock(**_mock_config(request, OPENAI_MOCK_CONFIG, OPENAI_FAILURE_CONFIG))
+    monkeypatch.setattr('openai.OpenAI', lambda *args, **kwargs: mock_client)
+    return mock_client
 
 
 @pytest.fixture(scope="function")
-def mock_raganything():
+def mock_raganything(monkeypatch):
     """Mock RAG-Anything processing for testing."""
-    with patch('app.services.document_processor.process_with_raganything') as mock_process:
-        mock_process.return_value = {
-            "extracted_text": "Test extracted text",
-            "metadata": {"pages": 1, "format": "text"},
-            "entities": ["AI", "ML"],
-            "success": True
+    mock_process = Mock(**RAGANYTHING_MOCK_CONFIG)
+    monkeypatch.setattr('app.services.document_processor.process_with_raganything', mock_process)
+    return mock_process
+
+
+@pytest.fixture(scope="function")
+def service_constructor_patches():
+    """Patch the external service constructors for one test.
+    
+    Only the constructors are patched here; ``mock_all_services`` hands the
+    test fresh instances through their ``return_value``. The patches are
+    undone when the test finishes.
+    """
+    with ExitStack() as stack:
+        yield {
+            "redis": stack.enter_context(patch('redis.Redis')),
+            "openai": stack.enter_context(patch('openai.OpenAI')),
         }
-        yield mock_process
 
 
 @pytest.fixture(scope="function")
-def mock_all_services(mock_redis, mock_celery, mock_lightrag, mock_openai, mock_raganything):
+def mock_all_services(service_constructor_patches, mock_celery, mock_lightrag, mock_raganything):
     """Mock all external services for comprehensive testing."""
+    instances = {
+        "redis": Mock(**REDIS_MOCK_CONFIG),
+        "openai": Mock(**OPENAI_MOCK_CONFIG),
+    }
+    for name, instance in instances.items():
+        service_constructor_patches[name].return_value = instance
+    
     return {
-        "redis": mock_redis,
+        "redis": instances["redis"],
         "celery": mock_celery,
         "lightrag": mock_lightrag,
-        "openai": mock_openai,
+        "openai": instances["openai"],
         "raganything": mock_raganything
     }
 
 
-@pytest.fixture(scope="function")
+@pytest.fixture(scope="session")
 def sample_document_data():
-    """Sample document data for testing."""
-    return {
-        "filename": "test_document.txt",
-        "file_type": "text/plain",
-        "file_size": 1024,
-        "extracted_text": "This is test content",
-        "processing_status": "completed",
-        "doc_metadata": {"pages": 1}
-    }
+    """Sample document data for testing (read-only)."""
+    return SAMPLE_DOCUMENT_DATA
+
+
+@pytest.fixture(scope="function")
+def mutable_sample_document_data():
+    """Sample document data that the test is free to modify."""
+    return copy.deepcopy(dict(SAMPLE_DOCUMENT_DATA))
+
+
+@pytest.fixture(scope="function")
+def queued_document(test_db_session, test_files):
+    """Text document queued for processing, rolled back with the session."""
+    filename, _ = TEST_FILE_CONTENTS["text"]
+    document = Document(
+        filename=filename,
+        file_type="text/plain",
+        file_size=1024,
+        file_path=test_files['text'],
+        processing_status="queued"
+    )
+    test_db_session.add(document)
+    # flush() assigns the id without expiring the instance, unlike commit()
+    test_db_session.flush()
+    return document
 
 
 # Test data fixtures
 @pytest.fixture(scope="session")
 def test_queries():
     """Common test queries for search and RAG testing."""
-    return [
-        "artificial intelligence",
-        "machine learning algorithms",
-        "knowledge graph construction",
-        "semantic search functionality",
-        "document processing pipeline"
-    ]
+    return TEST_QUERIES
 
 
 @pytest.fixture(scope="session")
 def load_test_config():
     """Configuration for load testing."""
-    return {
-        "concurrent_uploads": 10,
-        "test_duration": 60,  # seconds
-        "max_file_size": 1024 * 1024,  # 1MB
-        "timeout": 30  # seconds
-    }
+    return LOAD_TEST_CONFIG
 
 
 # Error simulation fixtures
-@pytest.fixture(scope="function")
-def simulate_redis_failure():
-    """Simulate Redis connection failure."""
-    with patch('redis.Redis') as mock_redis_class:
-        mock_redis_instance = Mock()
-        mock_redis_instance.ping.side_effect = Exception("Redis connection failed")
-        mock_redis_class.return_value = mock_redis_instance
-        yield mock_redis_instance
-
-
-@pytest.fixture(scope="function")
-def simulate_celery_failure():
-    """Simulate Celery worker failure."""
-    with patch('app.core.celery_app.celery_app') as mock_celery_app:
-        mock_celery_app.control.inspect.side_effect = Exception("Celery connection failed")
-        yield mock_celery_app
-
-
+# Redis, Celery and OpenAI failures are requested through the "fail"
+# parameter of mock_redis, mock_celery and mock_openai.
 @pytest.fixture(scope="function")
 def simulate_storage_failure():
     """Simulate storage access failure."""
@@ -286,49 +650,79 @@ def simulate_storage_failure():
         yield
 
 
+# Deterministic data fixtures
+# Version-4 formatted IDs that are identical from run to run
+TEST_UUIDS = tuple(uuid.UUID(int=i, version=4) for i in range(1, 1001))
+
+
 @pytest.fixture(scope="function")
-def simulate_openai_failure():
-    """Simulate OpenAI API failure."""
-    with patch('openai.OpenAI') as mock_openai_class:
-        mock_client = Mock()
-        mock_client.models.list.side_effect = Exception("OpenAI API unavailable")
-        mock_openai_class.return_value = mock_client
-        yield mock_client
+def deterministic_uuids(monkeypatch):
+    """Make uuid.uuid4 hand out TEST_UUIDS in order for this test.
+    
+    Once the pre-generated IDs run out, random ones are returned again.
+    """
+    ids = iter(TEST_UUIDS)
+    random_uuid4 = uuid.uuid4
+    monkeypatch.setattr(uuid, "uuid4", lambda: next(ids, None) or random_uuid4())
+    return TEST_UUIDS
+
+
+@pytest.fixture(scope="function")
+def memoized_fallback_embeddings(monkeypatch):
+    """Memoize DocumentProcessor's hash-based fallback embeddings for one test.
+    
+    Opt in from tests that embed the same texts many times. Results are
+    cached per (processor, text) around the real bound call; callers still
+    get a fresh list every time.
+    """
+    from app.services.document_processor import DocumentProcessor
+    
+    generate = DocumentProcessor._generate_fallback_embedding
+    
+    @functools.lru_cache(maxsize=1024)
+    def cached_embedding(processor, text: str) -> tuple:
+        return tuple(generate(processor, text))
+    
+    def generate_cached(self, text: str) -> list:
+        return list(cached_embedding(self, text))
+    
+    monkeypatch.setattr(DocumentProcessor, "_generate_fallback_embedding", generate_cached)
+    return cached_embedding
 
 
 # Performance testing fixtures
+class PerformanceMonitor:
+    """Track wall time and resident memory across a block of test code."""
+    
+    def __init__(self):
+        self.start_time = None
+        self.end_time = None
+        self.start_memory = None
+        self.end_memory = None
+        self.process = psutil.Process()
+    
+    def start(self):
+        self.start_time = time.time()
+        self.start_memory = self.process.memory_info().rss
+    
+    def stop(self):
+        self.end_time = time.time()
+        self.end_memory = self.process.memory_info().rss
+    
+    @property
+    def duration(self):
+        if self.start_time and self.end_time:
+            return self.end_time - self.start_time
+        return None
+    
+    @property
+    def memory_delta(self):
+        if self.start_memory and self.end_memory:
+            return self.end_memory - self.start_memory
+        return None
+
+
 @pytest.fixture(scope="function")
 def performance_monitor():
     """Monitor performance metrics during tests."""
-    import time
-    import psutil
-    
-    class PerformanceMonitor:
-        def __init__(self):
-            self.start_time = None
-            self.end_time = None
-            self.start_memory = None
-            self.end_memory = None
-            self.process = psutil.Process()
-        
-        def start(self):
-            self.start_time = time.time()
-            self.start_memory = self.process.memory_info().rss
-        
-        def stop(self):
-            self.end_time = time.time()
-            self.end_memory = self.process.memory_info().rss
-        
-        @property
-        def duration(self):
-            if self.start_time and self.end_time:
-                return self.end_time - self.start_time
-            return None
-        
-        @property
-        def memory_delta(self):
-            if self.start_memory and self.end_memory:
-                return self.end_memory - self.start_memory
-            return None
-    
-    return PerformanceMonitor()
\ No newline at end of file
+    return PerformanceMonitor()
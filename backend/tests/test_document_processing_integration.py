@@ -20,23 +20,53 @@ from unittest.mock import Mock, patch, AsyncMock
 from fastapi import UploadFile
 from io import BytesIO
 
-from app.services.document_processor import DocumentProcessor
 from app.services.file_manager import FileManager
 from app.services.lightrag_service import LightRAGService
 from app.models.database import Document
-from app.models.schemas import DocumentCreate, DocumentResponse
+from app.models.schemas import DocumentBase, DocumentResponse
+
+# Query modes exercised by the search and knowledge graph tests
+QUERY_MODES = ["naive", "local", "global", "hybrid", "mix"]
+
+# Validated document fields shared by every Document built in this module
+_DOC_PAYLOAD = DocumentBase(
+    filename="test_document.txt",
+    file_type="text/plain",
+    file_size=1024
+).model_dump()
+
+# Canned search hits returned by the mocked search in the performance test
+_PERF_RESULTS = tuple({"document_id": f"doc{i}", "score": 0.9 - i*0.1} for i in range(20))
+
+
+def make_document(file_path: str, **overrides) -> Document:
+    """Build a queued text Document for file_path, with optional overrides."""
+    return Document(**{
+        **_DOC_PAYLOAD,
+        "file_path": file_path,
+        "processing_status": "queued",
+        **overrides
+    })
+
+
+@pytest.fixture(scope="function")
+def patched_rag_service():
+    """Patch RAGService and yield the mock instance it constructs."""
+    with patch('app.services.rag_service.RAGService') as mock_rag_service:
+        mock_service = AsyncMock()
+        mock_rag_service.return_value = mock_service
+        yield mock_service
 
 
 class TestDocumentUploadIntegration:
     """Test document upload integration."""
     
     @pytest.mark.asyncio
-    async def test_complete_upload_workflow(self, test_client, test_files, mock_all_services):
+    async def test_complete_upload_workflow(self, async_client, test_file_bytes, mock_all_services):
         """Test complete document upload workflow."""
         # Test file upload
-        with open(test_files['text'], 'rb') as f:
-            files = {'file': ('test_document.txt', f, 'text/plain')}
-            response = test_client.post("/api/v1/documents/upload", files=files)
+        files = {'file': ('test_document.txt', BytesIO(test_file_bytes['text']), 'text/plain')}
+        response = await async_client.post("/api/v1/documents/upload", files=files)
         
         assert response.status_code == 200
         data = response.json()
@@ -50,7 +80,7 @@ class TestDocumentUploadIntegration:
         document_id = data["document_id"]
         
         # Test document retrieval
-        response = test_client.get(f"/api/v1/documents/{document_id}")
+        response = await async_client.get(f"/api/v1/documents/{document_id}")
         assert response.status_code == 200
         
         doc_data = response.json()
@@ -59,7 +89,7 @@ class TestDocumentUploadIntegration:
         assert doc_data["file_type"] == "text/plain"
     
     @pytest.mark.asyncio
-    async def test_multimodal_file_upload(self, test_client, test_files, mock_all_services):
+    async def test_multimodal_file_upload(self, async_client, test_files, test_file_bytes, mock_all_services):
         """Test uploading different file types."""
         file_types = [
             ('text', 'text/plain'),
@@ -67,14 +97,16 @@ class TestDocumentUploadIntegration:
             ('json', 'application/json')
         ]
         
-        uploaded_docs = []
+        # Upload every file type concurrently
+        responses = await asyncio.gather(*(
+            async_client.post("/api/v1/documents/upload", files={
+                'file': (os.path.basename(test_files[file_key]), BytesIO(test_file_bytes[file_key]), content_type)
+            })
+            for file_key, content_type in file_types
+        ))
         
-        for file_key, content_type in file_types:
-            with open(test_files[file_key], 'rb') as f:
-                filename = os.path.basename(test_files[file_key])
-                files = {'file': (filename, f, content_type)}
-                response = test_client.post("/api/v1/documents/upload", files=files)
-            
+        uploaded_docs = []
+        for response in responses:
             assert response.status_code == 200
             data = response.json()
             uploaded_docs.append(data["document_id"])
@@ -83,34 +115,26 @@ class TestDocumentUploadIntegration:
         assert len(uploaded_docs) == 3
         
         # Test retrieving all documents
-        for doc_id in uploaded_docs:
-            response = test_client.get(f"/api/v1/documents/{doc_id}")
+        responses = await asyncio.gather(*(
+            async_client.get(f"/api/v1/documents/{doc_id}") for doc_id in uploaded_docs
+        ))
+        for response in responses:
             assert response.status_code == 200
     
     @pytest.mark.asyncio
-    async def test_upload_validation(self, test_client, temp_dir):
+    async def test_upload_validation(self, async_client):
         """Test file upload validation."""
         # Test empty file
-        empty_file = os.path.join(temp_dir, "empty.txt")
-        with open(empty_file, 'w') as f:
-            pass  # Create empty file
-        
-        with open(empty_file, 'rb') as f:
-            files = {'file': ('empty.txt', f, 'text/plain')}
-            response = test_client.post("/api/v1/documents/upload", files=files)
+        files = {'file': ('empty.txt', BytesIO(b""), 'text/plain')}
+        response = await async_client.post("/api/v1/documents/upload", files=files)
         
         # Should handle empty files gracefully
         assert response.status_code in [200, 400]
         
         # Test large filename
         long_filename = "a" * 300 + ".txt"
-        test_file = os.path.join(temp_dir, "test.txt")
-        with open(test_file, 'w') as f:
-            f.write("test content")
-        
-        with open(test_file, 'rb') as f:
-            files = {'file': (long_filename, f, 'text/plain')}
-            response = test_client.post("/api/v1/documents/upload", files=files)
+        files = {'file': (long_filename, BytesIO(b"test content"), 'text/plain')}
+        response = await async_client.post("/api/v1/documents/upload", files=files)
         
         # Should handle long filenames
         assert response.status_code in [200, 400]
@@ -120,56 +144,41 @@ class TestDocumentProcessingIntegration:
     """Test document processing integration."""
     
     @pytest.mark.asyncio
-    async def test_document_processor_workflow(self, test_db_session, test_files, mock_all_services):
+    async def test_document_processor_workflow(self, processor, monkeypatch, test_db_session, test_files, mock_all_services):
         """Test complete document processing workflow."""
         # Create document record
-        doc_data = DocumentCreate(
-            filename="test_document.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text']
-        )
-        
-        document = Document(**doc_data.dict())
+        document = make_document(test_files['text'])
         test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
+        test_db_session.flush()
+        
+        # Mock processing results
+        mock_rag_process = AsyncMock(return_value={
+            "extracted_text": "Test document content with AI and ML concepts",
+            "metadata": {"pages": 1, "format": "text"},
+            "entities": ["AI", "ML", "concepts"],
+            "success": True
+        })
+        mock_kg_update = AsyncMock(return_value=True)
+        mock_embeddings = AsyncMock(return_value=True)
+        monkeypatch.setattr(processor, '_process_with_raganything', mock_rag_process)
+        monkeypatch.setattr(processor, '_update_knowledge_graph', mock_kg_update)
+        monkeypatch.setattr(processor, '_generate_embeddings', mock_embeddings)
+        
+        # Process the document
+        result = await processor.process_document(document.id, test_files['text'])
         
-        # Process document
-        processor = DocumentProcessor()
+        assert result["success"] is True
+        assert result["extracted_text"] == "Test document content with AI and ML concepts"
+        assert "AI" in result["entities"]
         
-        with patch.object(processor, '_process_with_raganything') as mock_rag_process, \
-             patch.object(processor, '_update_knowledge_graph') as mock_kg_update, \
-             patch.object(processor, '_generate_embeddings') as mock_embeddings:
-            
-            # Mock processing results
-            mock_rag_process.return_value = {
-                "extracted_text": "Test document content with AI and ML concepts",
-                "metadata": {"pages": 1, "format": "text"},
-                "entities": ["AI", "ML", "concepts"],
-                "success": True
-            }
-            
-            mock_kg_update.return_value = True
-            mock_embeddings.return_value = True
-            
-            # Process the document
-            result = await processor.process_document(document.id, test_files['text'])
-            
-            assert result["success"] is True
-            assert result["extracted_text"] == "Test document content with AI and ML concepts"
-            assert "AI" in result["entities"]
-            
-            # Verify processing methods were called
-            mock_rag_process.assert_called_once()
-            mock_kg_update.assert_called_once()
-            mock_embeddings.assert_called_once()
+        # Verify processing methods were called
+        mock_rag_process.assert_called_once()
+        mock_kg_update.assert_called_once()
+        mock_embeddings.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_raganything_integration(self, test_files, mock_raganything):
+    async def test_raganything_integration(self, processor, test_files, mock_raganything):
         """Test RAG-Anything processing integration."""
-        processor = DocumentProcessor()
-        
         # Test text processing
         result = await processor._process_with_raganything(test_files['text'])
         
@@ -179,10 +188,8 @@ class TestDocumentProcessingIntegration:
         mock_raganything.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_lightrag_integration(self, mock_lightrag):
+    async def test_lightrag_integration(self, processor, mock_lightrag):
         """Test LightRAG knowledge graph integration."""
-        processor = DocumentProcessor()
-        
         # Mock document data
         doc_data = {
             "extracted_text": "This document discusses artificial intelligence and machine learning concepts.",
@@ -197,10 +204,8 @@ class TestDocumentProcessingIntegration:
         mock_lightrag.insert.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_embeddings_generation(self, mock_all_services):
+    async def test_embeddings_generation(self, processor, mock_all_services):
         """Test embeddings generation integration."""
-        processor = DocumentProcessor()
-        
         # Mock document data
         doc_data = {
             "extracted_text": "Test document for embeddings generation",
@@ -221,7 +226,7 @@ class TestSemanticSearchIntegration:
     """Test semantic search integration."""
     
     @pytest.mark.asyncio
-    async def test_semantic_search_workflow(self, test_client, mock_all_services):
+    async def test_semantic_search_workflow(self, async_client, mock_all_services, patched_rag_service):
         """Test complete semantic search workflow."""
         # Mock search data
         search_query = {
@@ -230,66 +235,58 @@ class TestSemanticSearchIntegration:
             "mode": "hybrid"
         }
         
-        with patch('app.services.rag_service.RAGService') as mock_rag_service:
-            mock_service = AsyncMock()
-            mock_service.search.return_value = {
-                "results": [
-                    {
-                        "document_id": "doc1",
-                        "score": 0.95,
-                        "content": "AI and ML content",
-                        "metadata": {"filename": "test.txt"}
-                    }
-                ],
-                "total": 1,
-                "query": search_query["query"]
-            }
-            mock_rag_service.return_value = mock_service
-            
-            response = test_client.post("/api/v1/search", json=search_query)
-            
-            assert response.status_code == 200
-            data = response.json()
-            
-            assert "results" in data
-            assert len(data["results"]) == 1
-            assert data["results"][0]["score"] == 0.95
-            assert data["total"] == 1
+        patched_rag_service.search.return_value = {
+            "results": [
+                {
+                    "document_id": "doc1",
+                    "score": 0.95,
+                    "content": "AI and ML content",
+                    "metadata": {"filename": "test.txt"}
+                }
+            ],
+            "total": 1,
+            "query": search_query["query"]
+        }
+        
+        response = await async_client.post("/api/v1/search", json=search_query)
+        
+        assert response.status_code == 200
+        data = response.json()
+        
+        assert "results" in data
+        assert len(data["results"]) == 1
+        assert data["results"][0]["score"] == 0.95
+        assert data["total"] == 1
     
+    @pytest.mark.parametrize("mode", QUERY_MODES)
     @pytest.mark.asyncio
-    async def test_different_search_modes(self, test_client, mock_all_services):
+    async def test_different_search_modes(self, async_client, mock_all_services, patched_rag_service, mode):
         """Test different RAG search modes."""
-        search_modes = ["naive", "local", "global", "hybrid", "mix"]
+        search_query = {
+            "query": "test query",
+            "limit": 3,
+            "mode": mode
+        }
         
-        for mode in search_modes:
-            search_query = {
-                "query": "test query",
-                "limit": 3,
-                "mode": mode
-            }
-            
-            with patch('app.services.rag_service.RAGService') as mock_rag_service:
-                mock_service = AsyncMock()
-                mock_service.search.return_value = {
-                    "results": [],
-                    "total": 0,
-                    "query": search_query["query"],
-                    "mode": mode
-                }
-                mock_rag_service.return_value = mock_service
-                
-                response = test_client.post("/api/v1/search", json=search_query)
-                
-                assert response.status_code == 200
-                data = response.json()
-                assert "results" in data
+        patched_rag_service.search.return_value = {
+            "results": [],
+            "total": 0,
+            "query": search_query["query"],
+            "mode": mode
+        }
+        
+        response = await async_client.post("/api/v1/search", json=search_query)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert "results" in data
 
 
 class TestKnowledgeGraphIntegration:
     """Test knowledge graph integration."""
     
     @pytest.mark.asyncio
-    async def test_knowledge_graph_query(self, test_client, mock_lightrag):
+    async def test_knowledge_graph_query(self, async_client, mock_lightrag):
         """Test knowledge graph query integration."""
         query_data = {
             "query": "What is the relationship between AI and machine learning?",
@@ -308,7 +305,7 @@ class TestKnowledgeGraphIntegration:
         }
         
         with patch('app.services.lightrag_service.lightrag_service', mock_lightrag):
-            response = test_client.post("/api/v1/rag/query", json=query_data)
+            response = await async_client.post("/api/v1/rag/query", json=query_data)
         
         assert response.status_code == 200
         data = response.json()
@@ -320,114 +317,88 @@ class TestKnowledgeGraphIntegration:
         assert len(data["entities"]) == 2
         assert len(data["relationships"]) == 1
     
+    @pytest.mark.parametrize("mode", QUERY_MODES)
     @pytest.mark.asyncio
-    async def test_knowledge_graph_modes(self, test_client, mock_lightrag):
+    async def test_knowledge_graph_modes(self, async_client, mock_lightrag, mode):
         """Test different knowledge graph query modes."""
-        modes = ["naive", "local", "global", "hybrid", "mix"]
+        query_data = {
+            "query": f"Test query for {mode} mode",
+            "mode": mode,
+            "max_tokens": 500
+        }
         
-        for mode in modes:
-            query_data = {
-                "query": f"Test query for {mode} mode",
-                "mode": mode,
-                "max_tokens": 500
-            }
-            
-            mock_lightrag.query.return_value = {
-                "answer": f"Answer for {mode} mode",
-                "sources": [],
-                "entities": [],
-                "relationships": []
-            }
-            
-            with patch('app.services.lightrag_service.lightrag_service', mock_lightrag):
-                response = test_client.post("/api/v1/rag/query", json=query_data)
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["answer"] == f"Answer for {mode} mode"
+        mock_lightrag.query.return_value = {
+            "answer": f"Answer for {mode} mode",
+            "sources": [],
+            "entities": [],
+            "relationships": []
+        }
+        
+        with patch('app.services.lightrag_service.lightrag_service', mock_lightrag):
+            response = await async_client.post("/api/v1/rag/query", json=query_data)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["answer"] == f"Answer for {mode} mode"
 
 
 class TestErrorHandlingIntegration:
     """Test error handling in document processing integration."""
     
     @pytest.mark.asyncio
-    async def test_processing_failure_recovery(self, test_db_session, test_files):
+    async def test_processing_failure_recovery(self, processor, monkeypatch, queued_document, test_files):
         """Test recovery from processing failures."""
-        # Create document record
-        document = Document(
-            filename="test_document.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
+        # Simulate processing failure
+        monkeypatch.setattr(
+            processor, '_process_with_raganything',
+            AsyncMock(side_effect=Exception("Processing failed"))
         )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
         
-        processor = DocumentProcessor()
+        result = await processor.process_document(queued_document.id, test_files['text'])
         
-        # Simulate processing failure
-        with patch.object(processor, '_process_with_raganything') as mock_process:
-            mock_process.side_effect = Exception("Processing failed")
-            
-            result = await processor.process_document(document.id, test_files['text'])
-            
-            assert result["success"] is False
-            assert "error" in result
-            assert "Processing failed" in result["error"]
+        assert result["success"] is False
+        assert "error" in result
+        assert "Processing failed" in result["error"]
     
     @pytest.mark.asyncio
-    async def test_partial_processing_success(self, test_db_session, test_files, mock_raganything):
+    async def test_partial_processing_success(self, processor, monkeypatch, queued_document, test_files,
+                                              mock_raganything):
         """Test handling of partial processing success."""
-        document = Document(
-            filename="test_document.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
+        # RAG processing succeeds
+        monkeypatch.setattr(processor, '_process_with_raganything', AsyncMock(return_value={
+            "extracted_text": "Test content",
+            "metadata": {"pages": 1},
+            "entities": ["test"],
+            "success": True
+        }))
+        
+        # Knowledge graph update fails
+        monkeypatch.setattr(
+            processor, '_update_knowledge_graph',
+            AsyncMock(side_effect=Exception("KG update failed"))
         )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
         
-        processor = DocumentProcessor()
+        # Embeddings succeed
+        monkeypatch.setattr(processor, '_generate_embeddings', AsyncMock(return_value=True))
         
-        with patch.object(processor, '_process_with_raganything') as mock_rag_process, \
-             patch.object(processor, '_update_knowledge_graph') as mock_kg_update, \
-             patch.object(processor, '_generate_embeddings') as mock_embeddings:
-            
-            # RAG processing succeeds
-            mock_rag_process.return_value = {
-                "extracted_text": "Test content",
-                "metadata": {"pages": 1},
-                "entities": ["test"],
-                "success": True
-            }
-            
-            # Knowledge graph update fails
-            mock_kg_update.side_effect = Exception("KG update failed")
-            
-            # Embeddings succeed
-            mock_embeddings.return_value = True
-            
-            result = await processor.process_document(document.id, test_files['text'])
-            
-            # Should still succeed with partial processing
-            assert result["success"] is True
-            assert "warnings" in result
-            assert "KG update failed" in str(result["warnings"])
+        result = await processor.process_document(queued_document.id, test_files['text'])
+        
+        # Should still succeed with partial processing
+        assert result["success"] is True
+        assert "warnings" in result
+        assert "KG update failed" in str(result["warnings"])
     
-    def test_upload_error_handling(self, test_client):
+    @pytest.mark.asyncio
+    async def test_upload_error_handling(self, async_client):
         """Test upload error handling."""
         # Test upload without file
-        response = test_client.post("/api/v1/documents/upload")
+        response = await async_client.post("/api/v1/documents/upload")
         assert response.status_code == 422  # Validation error
         
         # Test upload with invalid file type (if validation exists)
         invalid_content = b"invalid binary content"
         files = {'file': ('test.exe', BytesIO(invalid_content), 'application/x-executable')}
-        response = test_client.post("/api/v1/documents/upload", files=files)
+        response = await async_client.post("/api/v1/documents/upload", files=files)
         
         # Should either accept or reject gracefully
         assert response.status_code in [200, 400, 422]
@@ -437,47 +408,38 @@ class TestConcurrentProcessingIntegration:
     """Test concurrent document processing."""
     
     @pytest.mark.asyncio
-    async def test_concurrent_uploads(self, test_client, test_files, mock_all_services):
+    async def test_concurrent_uploads(self, async_client, test_file_bytes, mock_all_services):
         """Test concurrent document uploads."""
-        import asyncio
-        import aiohttp
-        
-        async def upload_document(session, file_path):
-            """Upload a single document."""
-            with open(file_path, 'rb') as f:
-                filename = os.path.basename(file_path)
-                data = aiohttp.FormData()
-                data.add_field('file', f, filename=filename, content_type='text/plain')
-                
-                async with session.post('http://localhost:8000/api/v1/documents/upload', 
-                                      data=data) as response:
-                    return await response.json()
-        
-        # Skip this test if we can't make async HTTP requests
-        # (This would require the actual server to be running)
-        pytest.skip("Requires running server for async HTTP requests")
+        upload_count = 5
+        
+        # Uploads run concurrently in-process through the ASGI transport
+        responses = await asyncio.gather(*(
+            async_client.post("/api/v1/documents/upload", files={
+                'file': (f"concurrent_{i}.txt", BytesIO(test_file_bytes['text']), 'text/plain')
+            })
+            for i in range(upload_count)
+        ))
+        
+        assert all(response.status_code == 200 for response in responses)
+        
+        # Every upload should have produced its own document
+        document_ids = {response.json()["document_id"] for response in responses}
+        assert len(document_ids) == upload_count
     
     @pytest.mark.asyncio
-    async def test_concurrent_processing_tasks(self, test_db_session, test_files, mock_all_services):
+    async def test_concurrent_processing_tasks(self, processor, test_db_session, test_files, mock_all_services):
         """Test concurrent document processing tasks."""
-        # Create multiple documents
-        documents = []
-        for i, file_path in enumerate(test_files.values()):
-            doc = Document(
-                filename=f"test_doc_{i}.txt",
-                file_type="text/plain",
-                file_size=1024,
-                file_path=file_path,
-                processing_status="queued"
-            )
-            test_db_session.add(doc)
-            documents.append(doc)
-        
-        test_db_session.commit()
+        # Create multiple documents and insert them in one batch
+        with test_db_session.no_autoflush:
+            documents = [
+                make_document(file_path, filename=f"test_doc_{i}.txt")
+                for i, file_path in enumerate(test_files.values())
+            ]
+            test_db_session.add_all(documents)
         
-        # Process documents concurrently
-        processor = DocumentProcessor()
+        test_db_session.flush()
         
+        # Process documents concurrently
         async def process_doc(doc):
             return await processor.process_document(doc.id, doc.file_path)
         
@@ -497,34 +459,19 @@ class TestPerformanceIntegration:
     """Test performance aspects of document processing integration."""
     
     @pytest.mark.asyncio
-    async def test_processing_performance(self, test_db_session, test_files, 
-                                        mock_all_services, performance_monitor):
+    async def test_processing_performance(self, processor, queued_document, test_files,
+                                          mock_all_services):
         """Test document processing performance."""
-        document = Document(
-            filename="test_document.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
-        )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        processor = DocumentProcessor()
+        start = time.perf_counter()
         
-        performance_monitor.start()
-        
-        result = await processor.process_document(document.id, test_files['text'])
-        
-        performance_monitor.stop()
+        result = await processor.process_document(queued_document.id, test_files['text'])
         
         # Processing should complete within reasonable time
-        assert performance_monitor.duration < 10.0  # 10 seconds max
+        assert time.perf_counter() - start < 10.0  # 10 seconds max
         assert result["success"] is True
     
     @pytest.mark.asyncio
-    async def test_search_performance(self, test_client, mock_all_services, performance_monitor):
+    async def test_search_performance(self, async_client, mock_all_services, patched_rag_service):
         """Test search performance."""
         search_query = {
             "query": "artificial intelligence machine learning deep learning neural networks",
@@ -532,28 +479,21 @@ class TestPerformanceIntegration:
             "mode": "hybrid"
         }
         
-        with patch('app.services.rag_service.RAGService') as mock_rag_service:
-            mock_service = AsyncMock()
-            
-            # Simulate realistic search delay
-            async def slow_search(*args, **kwargs):
-                await asyncio.sleep(0.1)  # 100ms delay
-                return {
-                    "results": [{"document_id": f"doc{i}", "score": 0.9 - i*0.1} 
-                              for i in range(20)],
-                    "total": 20,
-                    "query": search_query["query"]
-                }
-            
-            mock_service.search = slow_search
-            mock_rag_service.return_value = mock_service
-            
-            performance_monitor.start()
-            
-            response = test_client.post("/api/v1/search", json=search_query)
-            
-            performance_monitor.stop()
-            
-            assert response.status_code == 200
-            # Search should complete within 5 seconds
-            assert performance_monitor.duration < 5.0
\ No newline at end of file
+        # Yield to the event loop like a real search without adding delay
+        async def slow_search(*args, **kwargs):
+            await asyncio.sleep(0)
+            return {
+                "results": list(_PERF_RESULTS),
+                "total": len(_PERF_RESULTS),
+                "query": search_query["query"]
+            }
+        
+        patched_rag_service.search = slow_search
+        
+        start = time.perf_counter()
+        
+        response = await async_client.post("/api/v1/search", json=search_query)
+        
+        assert response.status_code == 200
+        # Search should complete within 5 seconds
+        assert time.perf_counter() - start < 5.0
\ No newline at end of file
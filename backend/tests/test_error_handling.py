@@ -13,40 +13,140 @@ Requirements tested: 3.1, 3.2, 2.4
 
 import pytest
 import asyncio
+import io
+import os
+import re
 import time
-from unittest.mock import Mock, patch, AsyncMock, MagicMock
-from fastapi import HTTPException
+import structlog.testing
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, Mock, patch
 from sqlalchemy.exc import SQLAlchemyError
 import redis.exceptions
 import celery.exceptions
 
-from app.services.document_processor import DocumentProcessor
 from app.services.file_manager import FileManager
+from app.services.openai_service import OpenAIService
 from app.services.rag_service import RAGService
 from app.services.lightrag_service import LightRAGService
-from app.core.retry_utils import retry_with_backoff
+from app.api.endpoints.health import check_redis_health
+from app.core.celery_app import celery_app
+from app.core.exceptions import DocumentProcessingError
+from app.core.retry_utils import retry_with_backoff, RetryConfig
 from app.models.database import Document
+from app.tasks import maintenance
+from app.tasks.document_processing import process_document_task
+from app.tasks.maintenance import requeue_stuck_documents
+
+# Case-insensitive matchers for the error text checked below
+_ERR_MISSING_FILE = re.compile(r"not found|no such file", re.I)
+_ERR_MEMORY = re.compile(r"memory", re.I)
+
+# Fallback-shaped extraction result returned by patched processing stages
+_EXTRACTION_RESULT = {
+    "extracted_text": "Test content",
+    "metadata": {"pages": 1},
+    "entities": ["test"],
+    "success": True
+}
+
+
+def _insert(session, **kwargs) -> Document:
+    """Add a Document and flush so its primary key is assigned.
+    
+    The test_db_session fixture rolls everything back, so there is no need to
+    commit, and flush already fills in the id without a refresh SELECT.
+    """
+    document = Document(**kwargs)
+    session.add(document)
+    session.flush()
+    return document
+
+
+@pytest.fixture(scope="function")
+def fallback_processor(processor, monkeypatch):
+    """Shared processor pinned to _process_with_fallback as its processing stage."""
+    monkeypatch.setattr(processor, "rag_anything", None)
+    return processor
+
+
+@pytest.fixture(scope="function")
+def task_pipeline(monkeypatch):
+    """Run process_document_task in-process with its database writes stubbed.
+    
+    The processor returns _EXTRACTION_RESULT and embeddings are stored; tests
+    decide how the knowledge graph stage behaves.
+    """
+    from app.tasks import document_processing
+    
+    stubs = {
+        name: Mock()
+        for name in ("update_task_progress", "update_document_status", "_save_processing_results")
+    }
+    for name, stub in stubs.items():
+        monkeypatch.setattr(document_processing, name, stub)
+    monkeypatch.setattr(
+        document_processing.document_processor, "process_document",
+        AsyncMock(return_value=dict(_EXTRACTION_RESULT))
+    )
+    monkeypatch.setattr(document_processing, "_store_embeddings", AsyncMock(return_value=True))
+    return stubs
+
+
+@pytest.fixture(scope="function")
+def processor_errors():
+    """Error events logged through structlog while the test runs."""
+    with structlog.testing.capture_logs() as events:
+        yield events
+
+
+def _refuse_connection(*args, **kwargs):
+    """Stand-in for ConnectionPool.get_connection when Redis is down."""
+    raise redis.exceptions.ConnectionError("Connection refused")
+
+
+class _UnavailableOpenAIService:
+    """OpenAI service stand-in that reports itself unavailable."""
+    
+    def is_available(self):
+        return False
+
+
+class _BasicSearchRAGService:
+    """RAG service stand-in answering searches in degraded basic mode."""
+    
+    async def search(self, *args, **kwargs):
+        return {
+            "results": [{"document_id": "doc1", "score": 0.8, "content": "basic search result"}],
+            "total": 1,
+            "query": "test query",
+            "mode": "basic"  # Degraded mode
+        }
+
+
+@celery_app.task(name="tests.unavailable_task")
+def unavailable_task(*args, **kwargs):
+    """Stand-in task that fails the way an unreachable Celery would."""
+    raise ConnectionError("Celery unavailable")
 
 
 class TestServiceFailureHandling:
     """Test handling of external service failures."""
     
     @pytest.mark.asyncio
-    async def test_redis_connection_failure_handling(self, test_client):
+    async def test_redis_connection_failure_handling(self, test_client, fake_redis, fake_redis_pool, monkeypatch):
         """Test handling of Redis connection failures."""
-        with patch('redis.Redis') as mock_redis_class:
-            # Simulate Redis connection failure
-            mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Connection refused")
-            mock_redis_class.return_value = mock_redis_instance
-            
-            # Health check should handle the failure gracefully
-            response = test_client.get("/api/v1/health/redis")
-            
-            assert response.status_code == 200
-            data = response.json()
-            assert data["status"] == "unhealthy"
-            assert "Connection refused" in data["details"]["error"]
+        # Simulate Redis connection failure
+        monkeypatch.setattr(fake_redis_pool, "get_connection", _refuse_connection)
+        
+        # Health check should handle the failure gracefully
+        response = await asyncio.to_thread(test_client.get, "/api/v1/health/redis")
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "unhealthy"
+        assert "Connection refused" in data["details"]["message"]
+        # Pool keepalive settings are reported for diagnosing flapping connections
+        assert data["details"]["config"]["health_check_interval"] == 30
     
     @pytest.mark.asyncio
     async def test_celery_worker_failure_handling(self, test_client):
@@ -55,7 +155,7 @@ class TestServiceFailureHandling:
             # Simulate Celery connection failure
             mock_celery.control.inspect.side_effect = celery.exceptions.WorkerLostError("Worker lost")
             
-            response = test_client.get("/api/v1/health/celery")
+            response = await asyncio.to_thread(test_client.get, "/api/v1/health/celery")
             
             assert response.status_code == 200
             data = response.json()
@@ -71,7 +171,7 @@ class TestServiceFailureHandling:
             mock_openai_class.return_value = mock_client
             
             with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
-                response = test_client.get("/api/v1/health/openai")
+                response = await asyncio.to_thread(test_client.get, "/api/v1/health/openai")
             
             assert response.status_code == 200
             data = response.json()
@@ -84,7 +184,7 @@ class TestServiceFailureHandling:
         with patch('app.services.lightrag_service.lightrag_service') as mock_lightrag:
             mock_lightrag.is_initialized.side_effect = Exception("LightRAG initialization failed")
             
-            response = test_client.get("/api/v1/health/lightrag")
+            response = await asyncio.to_thread(test_client.get, "/api/v1/health/lightrag")
             
             assert response.status_code == 200
             data = response.json()
@@ -100,7 +200,7 @@ class TestServiceFailureHandling:
             mock_exists.return_value = False
             mock_makedirs.side_effect = PermissionError("Permission denied")
             
-            response = test_client.get("/api/v1/health/storage")
+            response = await asyncio.to_thread(test_client.get, "/api/v1/health/storage")
             
             assert response.status_code == 200
             data = response.json()
@@ -118,9 +218,8 @@ class TestDatabaseErrorHandling:
             mock_get_db.side_effect = SQLAlchemyError("Database connection failed")
             
             # Test document upload with database failure
-            with open(__file__, 'rb') as f:
-                files = {'file': ('test.py', f, 'text/plain')}
-                response = test_client.post("/api/v1/documents/upload", files=files)
+            files = {'file': ('test.py', io.BytesIO(b'print("hi")\n'), 'text/plain')}
+            response = await asyncio.to_thread(test_client.post, "/api/v1/documents/upload", files=files)
             
             # Should return appropriate error
             assert response.status_code == 500
@@ -128,8 +227,6 @@ class TestDatabaseErrorHandling:
     @pytest.mark.asyncio
     async def test_database_transaction_rollback(self, test_db_session, test_files):
         """Test database transaction rollback on errors."""
-        from app.services.file_manager import FileManager
-        
         file_manager = FileManager()
         
         # Simulate transaction failure
@@ -149,22 +246,8 @@ class TestDatabaseErrorHandling:
             assert test_db_session.rollback.called or True  # Mock doesn't track rollback
     
     @pytest.mark.asyncio
-    async def test_concurrent_database_access(self, test_db_session, test_files):
+    async def test_concurrent_database_access(self, test_db_session, queued_document):
         """Test handling of concurrent database access conflicts."""
-        from app.models.database import Document
-        
-        # Create document
-        document = Document(
-            filename="test.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
-        )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
         # Simulate concurrent update conflict
         with patch.object(test_db_session, 'commit') as mock_commit:
             mock_commit.side_effect = [
@@ -173,7 +256,7 @@ class TestDatabaseErrorHandling:
             ]
             
             # Should retry and succeed
-            document.processing_status = "processing"
+            queued_document.processing_status = "processing"
             
             # First commit fails, but error handling should manage it
             try:
@@ -188,29 +271,26 @@ class TestNetworkErrorHandling:
     """Test network-related error handling."""
     
     @pytest.mark.asyncio
-    async def test_timeout_handling(self, mock_openai):
+    async def test_timeout_handling(self):
         """Test handling of network timeouts."""
-        import asyncio
-        
-        # Simulate timeout
-        async def slow_api_call():
-            await asyncio.sleep(10)  # Longer than timeout
-            return {"models": []}
+        async def stalled_request(*args, **kwargs):
+            await asyncio.sleep(1)  # Longer than timeout
         
-        mock_openai.models.list.side_effect = asyncio.TimeoutError("Request timeout")
-        
-        from app.services.openai_service import OpenAIService
         openai_service = OpenAIService()
         
+        # Simulate an API that stops responding
+        openai_service.async_client = Mock()
+        openai_service.async_client.chat.completions.create = stalled_request
+        
         with pytest.raises(asyncio.TimeoutError):
-            await openai_service.list_models()
+            await asyncio.wait_for(openai_service.test_connectivity(), timeout=0.01)
     
     @pytest.mark.asyncio
     async def test_retry_mechanism(self):
         """Test retry mechanism for transient failures."""
         call_count = 0
         
-        @retry_with_backoff(max_retries=3, base_delay=0.1)
+        @retry_with_backoff(config=RetryConfig(max_retries=3, base_delay=0.1, retryable_exceptions=[Exception]))
         async def failing_function():
             nonlocal call_count
             call_count += 1
@@ -226,7 +306,7 @@ class TestNetworkErrorHandling:
     @pytest.mark.asyncio
     async def test_retry_exhaustion(self):
         """Test behavior when retries are exhausted."""
-        @retry_with_backoff(max_retries=2, base_delay=0.1)
+        @retry_with_backoff(config=RetryConfig(max_retries=2, base_delay=0.1, retryable_exceptions=[Exception]))
         async def always_failing_function():
             raise Exception("Permanent failure")
         
@@ -234,152 +314,116 @@ class TestNetworkErrorHandling:
             await always_failing_function()
         
         assert "Permanent failure" in str(exc_info.value)
+    
+    @pytest.mark.asyncio
+    async def test_retry_backoff_does_not_block_event_loop(self):
+        """Test that concurrent retries overlap their backoff waits."""
+        attempts = {}
+        
+        @retry_with_backoff(config=RetryConfig(max_retries=1, base_delay=0.2, jitter=False))
+        async def flaky_function(task_id):
+            attempts[task_id] = attempts.get(task_id, 0) + 1
+            if attempts[task_id] == 1:
+                raise ConnectionError("Transient failure")
+            return task_id
+        
+        start = time.perf_counter()
+        results = await asyncio.gather(*(flaky_function(i) for i in range(50)))
+        elapsed = time.perf_counter() - start
+        
+        assert results == list(range(50))
+        # 50 blocking 0.2s sleeps would take ~10s
+        assert elapsed < 1.0
 
 
 class TestDocumentProcessingErrorHandling:
     """Test error handling in document processing."""
     
     @pytest.mark.asyncio
-    async def test_file_corruption_handling(self, test_db_session, temp_dir):
+    async def test_file_corruption_handling(self, test_db_session, temp_dir, fallback_processor):
         """Test handling of corrupted files."""
         # Create corrupted file
         corrupted_file = os.path.join(temp_dir, "corrupted.txt")
         with open(corrupted_file, 'wb') as f:
             f.write(b'\x00\x01\x02\x03\xff\xfe\xfd')  # Invalid UTF-8
         
-        document = Document(
+        document = _insert(
+            test_db_session,
             filename="corrupted.txt",
             file_type="text/plain",
             file_size=7,
             file_path=corrupted_file,
             processing_status="queued"
         )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        processor = DocumentProcessor()
         
         # Should handle corruption gracefully
-        result = await processor.process_document(document.id, corrupted_file)
+        result = await fallback_processor.process_document(corrupted_file, document.id)
         
-        # Should fail gracefully with error information
-        assert result["success"] is False
-        assert "error" in result
+        # Undecodable bytes are dropped instead of failing the document
+        assert result["success"] is True
+        assert result["processing_mode"] == "fallback"
+        assert result["extracted_text"] == "\x00\x01\x02\x03"
     
     @pytest.mark.asyncio
-    async def test_missing_file_handling(self, test_db_session):
+    async def test_missing_file_handling(self, test_db_session, processor):
         """Test handling of missing files."""
-        document = Document(
+        document = _insert(
+            test_db_session,
             filename="missing.txt",
             file_type="text/plain",
             file_size=1024,
             file_path="/nonexistent/path/missing.txt",
             processing_status="queued"
         )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        processor = DocumentProcessor()
-        
-        result = await processor.process_document(document.id, "/nonexistent/path/missing.txt")
         
-        assert result["success"] is False
-        assert "error" in result
-        assert "not found" in result["error"].lower() or "no such file" in result["error"].lower()
+        with pytest.raises(DocumentProcessingError, match=_ERR_MISSING_FILE):
+            await processor.process_document("/nonexistent/path/missing.txt", document.id)
     
     @pytest.mark.asyncio
-    async def test_processing_memory_exhaustion(self, test_db_session, test_files):
+    async def test_processing_memory_exhaustion(self, test_files, fallback_processor, queued_document):
         """Test handling of memory exhaustion during processing."""
-        document = Document(
-            filename="test.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
-        )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        processor = DocumentProcessor()
-        
         # Simulate memory error
-        with patch.object(processor, '_process_with_raganything') as mock_process:
+        with patch.object(fallback_processor, '_process_with_fallback') as mock_process:
             mock_process.side_effect = MemoryError("Out of memory")
             
-            result = await processor.process_document(document.id, test_files['text'])
-            
-            assert result["success"] is False
-            assert "error" in result
-            assert "memory" in result["error"].lower()
+            with pytest.raises(DocumentProcessingError, match=_ERR_MEMORY):
+                await fallback_processor.process_document(test_files['text'], queued_document.id)
     
-    @pytest.mark.asyncio
-    async def test_partial_processing_failure(self, test_db_session, test_files, mock_raganything):
+    def test_partial_processing_failure(self, test_files, task_pipeline, queued_document):
         """Test handling of partial processing failures."""
-        document = Document(
-            filename="test.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
-        )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
+        from app.services.knowledge_graph import knowledge_graph_service
         
-        processor = DocumentProcessor()
-        
-        with patch.object(processor, '_process_with_raganything') as mock_rag_process, \
-             patch.object(processor, '_update_knowledge_graph') as mock_kg_update, \
-             patch.object(processor, '_generate_embeddings') as mock_embeddings:
-            
-            # RAG processing succeeds
-            mock_rag_process.return_value = {
-                "extracted_text": "Test content",
-                "metadata": {"pages": 1},
-                "entities": ["test"],
-                "success": True
-            }
+        # Knowledge graph fails; extraction and embeddings succeed
+        with patch.object(knowledge_graph_service, 'build_graph_from_document') as mock_build:
+            mock_build.side_effect = Exception("Knowledge graph update failed")
             
-            # Knowledge graph fails
-            mock_kg_update.side_effect = Exception("Knowledge graph update failed")
-            
-            # Embeddings succeed
-            mock_embeddings.return_value = True
-            
-            result = await processor.process_document(document.id, test_files['text'])
-            
-            # Should succeed with warnings about partial failure
-            assert result["success"] is True
-            assert "warnings" in result
-            assert any("knowledge graph" in str(w).lower() for w in result["warnings"])
+            result = process_document_task.run(queued_document.id, test_files['text'])
+        
+        # Should complete with the knowledge graph reported as not built
+        assert result["status"] == "completed"
+        assert result["knowledge_graph_built"] is False
+        assert result["embeddings_stored"] is True
+        task_pipeline["update_document_status"].assert_called_with(queued_document.id, "completed")
 
 
 class TestAPIErrorHandling:
     """Test API-level error handling."""
     
-    def test_invalid_request_handling(self, test_client):
-        """Test handling of invalid API requests."""
-        # Test invalid JSON
-        response = test_client.post(
-            "/api/v1/search",
-            data="invalid json",
-            headers={"Content-Type": "application/json"}
-        )
-        assert response.status_code == 422
-        
-        # Test missing required fields
-        response = test_client.post("/api/v1/search", json={})
-        assert response.status_code == 422
-        
-        # Test invalid field values
-        response = test_client.post("/api/v1/search", json={
+    @pytest.mark.parametrize("request_kwargs", [
+        # Invalid JSON
+        {"data": "invalid json", "headers": {"Content-Type": "application/json"}},
+        # Missing required fields
+        {"json": {}},
+        # Invalid field values
+        {"json": {
             "query": "",  # Empty query
             "limit": -1,  # Invalid limit
             "mode": "invalid_mode"  # Invalid mode
-        })
+        }},
+    ], ids=["invalid_json", "missing_fields", "invalid_values"])
+    def test_invalid_request_handling(self, test_client, request_kwargs):
+        """Test handling of invalid API requests."""
+        response = test_client.post("/api/v1/search", **request_kwargs)
         assert response.status_code == 422
     
     def test_nonexistent_resource_handling(self, test_client):
@@ -402,8 +446,10 @@ class TestAPIErrorHandling:
         """Test handling of oversized requests."""
         # Create large file (if size limits are implemented)
         large_file = os.path.join(temp_dir, "large.txt")
-        with open(large_file, 'w') as f:
-            f.write("x" * (10 * 1024 * 1024))  # 10MB file
+        with open(large_file, 'wb') as f:
+            # Text header, then extend to 10MB sparsely without building the bytes
+            f.write(b"x" * 4096)
+            os.ftruncate(f.fileno(), 10 * 1024 * 1024)
         
         with open(large_file, 'rb') as f:
             files = {'file': ('large.txt', f, 'text/plain')}
@@ -417,233 +463,216 @@ class TestGracefulDegradation:
     """Test graceful degradation when services are unavailable."""
     
     @pytest.mark.asyncio
-    async def test_search_without_openai(self, test_client, mock_redis, mock_celery):
+    async def test_search_without_openai(self, test_client, mock_redis, mock_celery, monkeypatch):
         """Test search functionality when OpenAI is unavailable."""
-        with patch('app.services.openai_service.OpenAIService') as mock_openai_service:
-            mock_service = AsyncMock()
-            mock_service.is_available.return_value = False
-            mock_openai_service.return_value = mock_service
-            
-            # Mock basic search without AI enhancement
-            with patch('app.services.rag_service.RAGService') as mock_rag_service:
-                mock_rag = AsyncMock()
-                mock_rag.search.return_value = {
-                    "results": [{"document_id": "doc1", "score": 0.8, "content": "basic search result"}],
-                    "total": 1,
-                    "query": "test query",
-                    "mode": "basic"  # Degraded mode
-                }
-                mock_rag_service.return_value = mock_rag
-                
-                response = test_client.post("/api/v1/search", json={
-                    "query": "test query",
-                    "limit": 5,
-                    "mode": "hybrid"
-                })
-                
-                assert response.status_code == 200
-                data = response.json()
-                assert "results" in data
-                # Should indicate degraded functionality
-                assert data.get("mode") == "basic" or "warning" in data
+        monkeypatch.setattr('app.services.openai_service.OpenAIService', _UnavailableOpenAIService)
+        
+        # Mock basic search without AI enhancement
+        monkeypatch.setattr('app.services.rag_service.RAGService', _BasicSearchRAGService)
+        
+        response = await asyncio.to_thread(test_client.post, "/api/v1/search", json={
+            "query": "test query",
+            "limit": 5,
+            "mode": "hybrid"
+        })
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert "results" in data
+        # Should indicate degraded functionality
+        assert data.get("mode") == "basic" or "warning" in data
     
-    @pytest.mark.asyncio
-    async def test_processing_without_lightrag(self, test_db_session, test_files, mock_raganything):
+    def test_processing_without_lightrag(self, test_files, task_pipeline, queued_document):
         """Test document processing when LightRAG is unavailable."""
-        document = Document(
-            filename="test.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
-        )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        processor = DocumentProcessor()
+        from app.services.knowledge_graph import knowledge_graph_service
         
-        with patch.object(processor, '_process_with_raganything') as mock_rag_process, \
-             patch.object(processor, '_update_knowledge_graph') as mock_kg_update, \
-             patch.object(processor, '_generate_embeddings') as mock_embeddings:
-            
-            # RAG processing succeeds
-            mock_rag_process.return_value = {
-                "extracted_text": "Test content",
-                "metadata": {"pages": 1},
-                "entities": ["test"],
-                "success": True
-            }
-            
-            # Knowledge graph unavailable
-            mock_kg_update.return_value = False  # Service unavailable
-            
-            # Embeddings succeed
-            mock_embeddings.return_value = True
-            
-            result = await processor.process_document(document.id, test_files['text'])
+        # Knowledge graph service reports itself unavailable
+        with patch.object(knowledge_graph_service, 'build_graph_from_document') as mock_build:
+            mock_build.return_value = {"success": False, "error": "LightRAG not initialized"}
             
-            # Should succeed with degraded functionality
-            assert result["success"] is True
-            assert "warnings" in result
-            assert any("knowledge graph" in str(w).lower() for w in result["warnings"])
+            result = process_document_task.run(queued_document.id, test_files['text'])
+        
+        # Should succeed with degraded functionality
+        assert result["status"] == "completed"
+        assert result["knowledge_graph_built"] is False
+        assert result["embeddings_stored"] is True
     
     @pytest.mark.asyncio
-    async def test_upload_without_celery(self, test_client, test_files):
+    async def test_upload_without_celery(self, test_client, test_files, monkeypatch):
         """Test document upload when Celery is unavailable."""
-        with patch('app.core.celery_app.celery_app') as mock_celery:
-            # Simulate Celery unavailable
-            mock_celery.send_task.side_effect = Exception("Celery unavailable")
-            
-            with open(test_files['text'], 'rb') as f:
-                files = {'file': ('test.txt', f, 'text/plain')}
-                response = test_client.post("/api/v1/documents/upload", files=files)
-            
-            # Should either process synchronously or queue for later
-            assert response.status_code in [200, 202, 503]
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Should indicate synchronous processing or degraded mode
-                assert "warning" in data or data.get("processing_mode") == "synchronous"
+        # Simulate Celery unavailable
+        monkeypatch.setattr("app.api.endpoints.documents.process_document_task", unavailable_task)
+        
+        with open(test_files['text'], 'rb') as f:
+            files = {'file': ('test.txt', f, 'text/plain')}
+            response = await asyncio.to_thread(test_client.post, "/api/v1/documents/upload", files=files)
+        
+        # Should either process synchronously or queue for later
+        assert response.status_code in [200, 202, 503]
+        
+        if response.status_code == 200:
+            data = response.json()
+            # Should indicate synchronous processing or degraded mode
+            assert "warning" in data or data.get("processing_mode") == "synchronous"
 
 
 class TestRecoveryMechanisms:
     """Test recovery mechanisms after failures."""
     
     @pytest.mark.asyncio
-    async def test_failed_task_retry(self, test_db_session, test_files):
+    async def test_failed_task_retry(self, test_db_session, test_files, fallback_processor):
         """Test retry mechanism for failed processing tasks."""
-        document = Document(
+        document = _insert(
+            test_db_session,
             filename="test.txt",
             file_type="text/plain",
             file_size=1024,
             file_path=test_files['text'],
-            processing_status="failed",
-            retry_count=0
+            processing_status="failed"
         )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        processor = DocumentProcessor()
         
         # First attempt fails
-        with patch.object(processor, '_process_with_raganything') as mock_process:
+        with patch.object(fallback_processor, '_process_with_fallback') as mock_process:
             mock_process.side_effect = [
                 Exception("Temporary failure"),  # First attempt
-                {  # Second attempt succeeds
-                    "extracted_text": "Test content",
-                    "metadata": {"pages": 1},
-                    "entities": ["test"],
-                    "success": True
-                }
+                dict(_EXTRACTION_RESULT)  # Second attempt succeeds
             ]
             
             # First attempt
-            result1 = await processor.process_document(document.id, test_files['text'])
-            assert result1["success"] is False
+            with pytest.raises(DocumentProcessingError, match="Temporary failure"):
+                await fallback_processor.process_document(test_files['text'], document.id)
             
             # Retry should succeed
-            result2 = await processor.process_document(document.id, test_files['text'])
-            assert result2["success"] is True
+            result = await fallback_processor.process_document(test_files['text'], document.id)
+            assert result["success"] is True
     
     @pytest.mark.asyncio
-    async def test_service_recovery_detection(self, test_client):
+    async def test_service_recovery_detection(self, test_client, fake_redis, fake_redis_pool, monkeypatch):
         """Test detection of service recovery after failures."""
         # First check - service is down
-        with patch('redis.Redis') as mock_redis_class:
-            mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Connection refused")
-            mock_redis_class.return_value = mock_redis_instance
+        with monkeypatch.context() as m:
+            m.setattr(fake_redis_pool, "get_connection", _refuse_connection)
             
-            response1 = test_client.get("/api/v1/health/redis")
+            response1 = await asyncio.to_thread(test_client.get, "/api/v1/health/redis")
             assert response1.json()["status"] == "unhealthy"
         
         # Second check - service is recovered
-        with patch('redis.Redis') as mock_redis_class:
-            mock_redis_instance = Mock()
-            mock_redis_instance.ping.return_value = True
-            mock_redis_instance.info.return_value = {"redis_version": "7.0.0"}
-            mock_redis_class.return_value = mock_redis_instance
-            
-            response2 = test_client.get("/api/v1/health/redis")
-            assert response2.json()["status"] == "healthy"
+        check_redis_health.cache_clear()
+        response2 = await asyncio.to_thread(test_client.get, "/api/v1/health/redis")
+        assert response2.json()["status"] == "healthy"
     
-    @pytest.mark.asyncio
-    async def test_data_consistency_recovery(self, test_db_session, test_files):
-        """Test recovery from data consistency issues."""
-        # Create document with inconsistent state
-        document = Document(
+    def test_data_consistency_recovery(self, test_db_session, test_files, monkeypatch):
+        """Test that a document stuck behind a lost task is requeued and redispatched."""
+        document = _insert(
+            test_db_session,
             filename="test.txt",
             file_type="text/plain",
             file_size=1024,
             file_path=test_files['text'],
             processing_status="processing",  # Stuck in processing
-            task_id="nonexistent-task-id"
+            task_id="nonexistent-task-id",
+            updated_at=datetime.utcnow() - timedelta(hours=1)
         )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        # Recovery mechanism should detect and fix inconsistent state
-        processor = DocumentProcessor()
+        # The task closes the session, which detaches the instance
+        document_id, version = document.id, document.version
+        delay = Mock(return_value=Mock(id="new-task-id"))
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda task_id: Mock(state="PENDING"))
+        monkeypatch.setattr(process_document_task, "delay", delay)
+        monkeypatch.setattr(maintenance, "SessionLocal", lambda: test_db_session)
+        
+        result = maintenance.recover_stuck_documents()
+        
+        assert result["requeued_documents"] == [document_id]
+        delay.assert_called_once_with(document_id, test_files['text'])
+        recovered = test_db_session.get(Document, document_id)
+        assert recovered.processing_status == "queued"
+        assert recovered.version == version + 1
+        assert recovered.task_id == "new-task-id"
+    
+    def test_stuck_document_dispatch_failure(self, test_db_session, test_files, monkeypatch):
+        """Test that a document whose redispatch fails is handed back to the sweep."""
+        document = _insert(
+            test_db_session,
+            filename="test.txt",
+            file_type="text/plain",
+            file_size=1024,
+            file_path=test_files['text'],
+            processing_status="processing",
+            task_id="nonexistent-task-id",
+            updated_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        document_id, version = document.id, document.version
+        delay = Mock(side_effect=celery.exceptions.OperationalError("Broker down"))
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda task_id: Mock(state="PENDING"))
+        monkeypatch.setattr(process_document_task, "delay", delay)
+        monkeypatch.setattr(maintenance, "SessionLocal", lambda: test_db_session)
+        
+        result = maintenance.recover_stuck_documents()
+        
+        assert result["failed_dispatches"] == [document_id]
+        recovered = test_db_session.get(Document, document_id)
+        assert recovered.processing_status == "processing"
+        assert recovered.version == version + 2
+        assert recovered.task_id == "nonexistent-task-id"
+    
+    def test_stuck_document_requeued_by_version(self, test_db_session, test_files, monkeypatch):
+        """Test that a document orphaned by a dead task is requeued via its version."""
+        document = _insert(
+            test_db_session,
+            filename="test.txt",
+            file_type="text/plain",
+            file_size=1024,
+            file_path=test_files['text'],
+            processing_status="processing",
+            task_id="nonexistent-task-id",
+            updated_at=datetime.utcnow() - timedelta(hours=1)
+        )
+        version = document.version
+        monkeypatch.setattr(celery_app, "AsyncResult", lambda task_id: Mock(state="PENDING"))
         
-        # Should detect inconsistent state and reset for reprocessing
-        result = await processor.process_document(document.id, test_files['text'])
+        requeued = requeue_stuck_documents(test_db_session)
         
-        # Should succeed after state recovery
-        assert result["success"] is True or "error" in result  # Either succeeds or fails gracefully
+        assert requeued == [(document.id, test_files['text'])]
+        test_db_session.refresh(document)
+        assert document.processing_status == "queued"
+        assert document.version == version + 1
 
 
 class TestErrorReporting:
     """Test error reporting and logging."""
     
     @pytest.mark.asyncio
-    async def test_error_context_logging(self, test_db_session, test_files, caplog):
+    async def test_error_context_logging(self, test_files, processor_errors, fallback_processor, queued_document):
         """Test that errors are logged with sufficient context."""
-        document = Document(
-            filename="test.txt",
-            file_type="text/plain",
-            file_size=1024,
-            file_path=test_files['text'],
-            processing_status="queued"
-        )
-        test_db_session.add(document)
-        test_db_session.commit()
-        test_db_session.refresh(document)
-        
-        processor = DocumentProcessor()
-        
-        with patch.object(processor, '_process_with_raganything') as mock_process:
+        with patch.object(fallback_processor, '_process_with_fallback') as mock_process:
             mock_process.side_effect = Exception("Test error for logging")
             
-            result = await processor.process_document(document.id, test_files['text'])
-            
-            assert result["success"] is False
+            with pytest.raises(DocumentProcessingError, match="Test error for logging"):
+                await fallback_processor.process_document(test_files['text'], queued_document.id)
             
             # Check that error was logged with context
-            assert any("Test error for logging" in record.message for record in caplog.records)
-            assert any(str(document.id) in record.message for record in caplog.records)
+            errors = [event for event in processor_errors if event["log_level"] == "error"]
+            assert any(
+                "Test error for logging" in event.get("error", "")
+                and event.get("document_id") == queued_document.id
+                for event in errors
+            )
     
-    def test_api_error_response_format(self, test_client):
+    @pytest.mark.parametrize("endpoint,expected_status", [
+        ("/api/v1/documents/nonexistent", 404),
+        ("/api/v1/search", 422),  # Missing required fields
+    ])
+    def test_api_error_response_format(self, test_client, endpoint, expected_status):
         """Test that API errors return consistent format."""
-        # Test various error scenarios
-        error_endpoints = [
-            ("/api/v1/documents/nonexistent", 404),
-            ("/api/v1/search", 422),  # Missing required fields
-        ]
-        
-        for endpoint, expected_status in error_endpoints:
-            if expected_status == 422:
-                response = test_client.post(endpoint, json={})
-            else:
-                response = test_client.get(endpoint)
-            
-            assert response.status_code == expected_status
-            
-            # Check error response format
-            if response.status_code >= 400:
-                data = response.json()
-                # Should have consistent error structure
-                assert "detail" in data or "error" in data or "message" in data
\ No newline at end of file
+        if expected_status == 422:
+            response = test_client.post(endpoint, json={})
+        else:
+            response = test_client.get(endpoint)
+        
+        assert response.status_code == expected_status
+        
+        # Check error response format
+        if response.status_code >= 400:
+            data = response.json()
+            # Should have consistent error structure
+            assert "detail" in data or "error" in data or "message" in data
\ No newline at end of file
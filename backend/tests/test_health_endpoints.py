@@ -12,9 +12,13 @@ Requirements tested: 8.4, 7.1, 7.2, 7.3, 7.4, 7.5
 
 import pytest
 import asyncio
+from datetime import datetime, timedelta
 from unittest.mock import Mock, patch, AsyncMock
 from fastapi import HTTPException
 
+from app.core.config import settings
+
+from app.api.endpoints import health
 from app.api.endpoints.health import (
     check_redis_health,
     check_celery_health,
@@ -26,18 +30,28 @@ from app.api.endpoints.health import (
 )
 
 
+def patched_storage_settings(temp_dir):
+    """Point every storage directory setting at temp_dir in one patch."""
+    return patch.multiple(
+        settings,
+        UPLOAD_DIR=temp_dir,
+        RAG_STORAGE_DIR=temp_dir,
+        CHROMA_DB_PATH=temp_dir
+    )
+
+
 class TestRedisHealthCheck:
     """Test Redis health check endpoint."""
     
     @pytest.mark.asyncio
     async def test_redis_healthy(self, mock_redis):
         """Test Redis health check when Redis is healthy."""
-        mock_redis.ping.return_value = True
-        mock_redis.info.return_value = {
+        info = {
             "redis_version": "7.0.0",
             "used_memory": 1024000,
             "connected_clients": 5
         }
+        mock_redis.pipeline.return_value.execute.return_value = [True, info, True, "test_value", 1]
         
         result = await check_redis_health()
         
@@ -49,7 +63,8 @@ class TestRedisHealthCheck:
         assert result.details["connected_clients"] == 5
     
     @pytest.mark.asyncio
-    async def test_redis_connection_failed(self, simulate_redis_failure):
+    @pytest.mark.parametrize("mock_redis", ["fail"], indirect=True)
+    async def test_redis_connection_failed(self, mock_redis):
         """Test Redis health check when connection fails."""
         result = await check_redis_health()
         
@@ -58,25 +73,40 @@ class TestRedisHealthCheck:
         assert "error" in result.details
         assert "Redis connection failed" in result.details["error"]
     
+    @pytest.mark.asyncio
+    async def test_redis_test_operations_failed(self, mock_redis):
+        """Test Redis health check when the value just written is not read back."""
+        mock_redis.pipeline.return_value.execute.return_value = [True, {}, True, None, 0]
+        
+        result = await check_redis_health()
+        
+        assert result.status == "unhealthy"
+        assert result.details["error"] == "Test operations failed"
+    
     @pytest.mark.asyncio
     async def test_redis_degraded_performance(self, mock_redis):
         """Test Redis health check with degraded performance."""
-        mock_redis.ping.return_value = True
-        mock_redis.info.return_value = {
+        info = {
             "redis_version": "7.0.0",
             "used_memory": 500000000,  # High memory usage
             "connected_clients": 100   # High client count
         }
+        pipeline = mock_redis.pipeline.return_value
+        pipeline.execute.return_value = [True, info, True, "test_value", 1]
         
-        # Simulate slow response
-        import time
-        original_ping = mock_redis.ping
-        def slow_ping():
-            time.sleep(0.1)  # 100ms delay
-            return original_ping()
-        mock_redis.ping = slow_ping
+        # Simulate slow response by advancing a fake clock instead of sleeping
+        clock = [datetime(2024, 1, 1)]
+        fake_datetime = Mock(wraps=datetime)
+        fake_datetime.utcnow.side_effect = lambda: clock[0]
         
-        result = await check_redis_health()
+        original_execute = pipeline.execute
+        def slow_execute():
+            clock[0] += timedelta(milliseconds=100)
+            return original_execute()
+        pipeline.execute = slow_execute
+        
+        with patch("app.api.endpoints.health.datetime", fake_datetime):
+            result = await check_redis_health()
         
         # Should still be healthy but with performance warnings
         assert result.status in ["healthy", "degraded"]
@@ -124,7 +154,8 @@ class TestCeleryHealthCheck:
         assert "No active workers" in result.details["error"]
     
     @pytest.mark.asyncio
-    async def test_celery_connection_failed(self, simulate_celery_failure):
+    @pytest.mark.parametrize("mock_celery", ["fail"], indirect=True)
+    async def test_celery_connection_failed(self, mock_celery):
         """Test Celery health check when connection fails."""
         result = await check_celery_health()
         
@@ -185,6 +216,15 @@ class TestLightRAGHealthCheck:
 class TestRAGAnythingHealthCheck:
     """Test RAG-Anything/MinerU health check endpoint."""
     
+    @pytest.fixture(autouse=True)
+    def _fresh_environment_probes(self):
+        """Re-query CUDA and installed packages so each test sees its own patches."""
+        health._cuda_status.cache_clear()
+        health._has_spec.cache_clear()
+        yield
+        health._cuda_status.cache_clear()
+        health._has_spec.cache_clear()
+    
     @pytest.mark.asyncio
     async def test_raganything_healthy(self):
         """Test RAG-Anything health check when service is healthy."""
@@ -262,7 +302,8 @@ class TestOpenAIHealthCheck:
         assert "API key not configured" in result.details["warning"]
     
     @pytest.mark.asyncio
-    async def test_openai_api_error(self, simulate_openai_failure):
+    @pytest.mark.parametrize("mock_openai", ["fail"], indirect=True)
+    async def test_openai_api_error(self, mock_openai):
         """Test OpenAI health check when API is unavailable."""
         with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
             result = await check_openai_health()
@@ -278,11 +319,7 @@ class TestStorageHealthCheck:
     @pytest.mark.asyncio
     async def test_storage_healthy(self, temp_dir):
         """Test storage health check when all directories are accessible."""
-        with patch('app.core.config.settings') as mock_settings:
-            mock_settings.UPLOAD_DIR = temp_dir
-            mock_settings.RAG_STORAGE_DIR = temp_dir
-            mock_settings.CHROMA_DB_PATH = temp_dir
-            
+        with patched_storage_settings(temp_dir):
             result = await check_storage_health()
         
         assert result.status == "healthy"
@@ -308,11 +345,7 @@ class TestComprehensiveHealthCheck:
     @pytest.mark.asyncio
     async def test_all_services_healthy(self, mock_all_services, temp_dir):
         """Test comprehensive health check when all services are healthy."""
-        with patch('app.core.config.settings') as mock_settings:
-            mock_settings.UPLOAD_DIR = temp_dir
-            mock_settings.RAG_STORAGE_DIR = temp_dir
-            mock_settings.CHROMA_DB_PATH = temp_dir
-            
+        with patched_storage_settings(temp_dir):
             with patch.dict('os.environ', {'OPENAI_API_KEY': 'test-key'}):
                 result = await comprehensive_health()
         
@@ -322,13 +355,10 @@ class TestComprehensiveHealthCheck:
         assert "All services are healthy" in result.summary
     
     @pytest.mark.asyncio
-    async def test_mixed_service_health(self, mock_redis, simulate_celery_failure, temp_dir):
+    @pytest.mark.parametrize("mock_celery", ["fail"], indirect=True)
+    async def test_mixed_service_health(self, mock_redis, mock_celery, temp_dir):
         """Test comprehensive health check with mixed service states."""
-        with patch('app.core.config.settings') as mock_settings:
-            mock_settings.UPLOAD_DIR = temp_dir
-            mock_settings.RAG_STORAGE_DIR = temp_dir
-            mock_settings.CHROMA_DB_PATH = temp_dir
-            
+        with patched_storage_settings(temp_dir):
             result = await comprehensive_health()
         
         assert result.overall_status in ["degraded", "unhealthy"]
@@ -340,8 +370,11 @@ class TestComprehensiveHealthCheck:
         assert "unhealthy" in statuses
     
     @pytest.mark.asyncio
-    async def test_all_services_unhealthy(self, simulate_redis_failure, simulate_celery_failure, 
-                                        simulate_storage_failure, simulate_openai_failure):
+    @pytest.mark.parametrize("mock_redis", ["fail"], indirect=True)
+    @pytest.mark.parametrize("mock_celery", ["fail"], indirect=True)
+    @pytest.mark.parametrize("mock_openai", ["fail"], indirect=True)
+    async def test_all_services_unhealthy(self, mock_redis, mock_celery,
+                                        simulate_storage_failure, mock_openai):
         """Test comprehensive health check when all services are unhealthy."""
         result = await comprehensive_health()
         
@@ -374,11 +407,7 @@ class TestHealthEndpointIntegration:
     
     def test_comprehensive_health_endpoint(self, test_client, mock_all_services, temp_dir):
         """Test comprehensive health endpoint via HTTP."""
-        with patch('app.core.config.settings') as mock_settings:
-            mock_settings.UPLOAD_DIR = temp_dir
-            mock_settings.RAG_STORAGE_DIR = temp_dir
-            mock_settings.CHROMA_DB_PATH = temp_dir
-            
+        with patched_storage_settings(temp_dir):
             response = test_client.get("/api/v1/health")
         
         assert response.status_code == 200
@@ -428,14 +457,113 @@ class TestHealthCheckPerformance:
         assert len(results) == 10
         assert all(hasattr(result, 'overall_status') for result in results)
     
-    def test_health_endpoint_caching(self, test_client, mock_all_services):
-        """Test that health endpoints can handle rapid requests."""
-        # Make 20 rapid requests
-        responses = []
-        for _ in range(20):
-            response = test_client.get("/api/v1/health")
-            responses.append(response)
-        
-        # All should succeed
+    @pytest.mark.asyncio
+    async def test_health_endpoint_caching(self, async_client, mock_all_services, monkeypatch):
+        """Test that a burst of comprehensive health requests runs the probes once."""
+        run = AsyncMock(wraps=health._run_comprehensive_health)
+        monkeypatch.setattr(health, "_run_comprehensive_health", run)
+        monkeypatch.setattr(settings, "HEALTH_CHECK_CACHE_TTL", 60)
+        
+        # Make 20 concurrent requests in-process
+        responses = await asyncio.gather(
+            *(async_client.get("/api/v1/health/comprehensive") for _ in range(20))
+        )
+        
+        # All should succeed and share one probe round and one encoded body
         assert all(r.status_code == 200 for r in responses)
-        assert all("overall_status" in r.json() for r in responses)
\ No newline at end of file
+        assert all("overall_status" in r.json() for r in responses)
+        assert run.await_count == 1
+        assert len({r.content for r in responses}) == 1
+    
+    @pytest.mark.asyncio
+    async def test_health_probe_result_cached_within_ttl(self, monkeypatch):
+        """Test that a probe result is reused while its TTL is fresh."""
+        monkeypatch.setattr(settings, "HEALTH_CHECK_CACHE_TTL", 60)
+        
+        first = await check_storage_health()
+        second = await check_storage_health()
+        
+        assert second is first
+        
+        # A TTL of 0 disables caching
+        monkeypatch.setattr(settings, "HEALTH_CHECK_CACHE_TTL", 0)
+        third = await check_storage_health()
+        
+        assert third is not first
+    
+    @pytest.mark.asyncio
+    async def test_health_probe_cache_keyed_by_client(self, monkeypatch):
+        """Test that a cached probe result is not served for another client."""
+        monkeypatch.setattr(settings, "HEALTH_CHECK_CACHE_TTL", 60)
+        healthy_client = Mock(**{
+            "pipeline.return_value.execute.return_value": [True, {}, True, "test_value", 1]
+        })
+        failing_client = Mock(**{
+            "pipeline.return_value.execute.side_effect": Exception("Redis connection failed")
+        })
+        
+        healthy = await check_redis_health(healthy_client)
+        failing = await check_redis_health(failing_client)
+        
+        assert healthy.status == "healthy"
+        assert failing.status == "unhealthy"
+        assert await check_redis_health(healthy_client) is not healthy
+        
+        check_redis_health.cache_clear()
+        assert await check_redis_health(failing_client) is not failing
+    
+    @pytest.mark.parametrize("ttl", [0, 60])
+    @pytest.mark.asyncio
+    async def test_comprehensive_health_single_flight(self, monkeypatch, ttl):
+        """Test that a burst of comprehensive checks shares one probe round."""
+        report = Mock()
+        
+        async def slow_run():
+            await asyncio.sleep(0.01)
+            return report
+        
+        run = AsyncMock(side_effect=slow_run)
+        monkeypatch.setattr(health, "_run_comprehensive_health", run)
+        monkeypatch.setattr(health, "_report_cache", None)
+        monkeypatch.setattr(health, "_report_inflight", None)
+        monkeypatch.setattr(settings, "HEALTH_CHECK_CACHE_TTL", ttl)
+        
+        results = await asyncio.gather(*(health.comprehensive_health() for _ in range(20)))
+        
+        assert run.await_count == 1
+        assert all(result is report for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_comprehensive_health_serves_cached_body(self, monkeypatch):
+        """Test that cache hits reuse the report's serialized JSON body."""
+        report = health.ComprehensiveHealthResponse(
+            overall_status="healthy",
+            services={},
+            timestamp=datetime.utcnow(),
+            summary={"healthy": 0, "degraded": 0, "unhealthy": 0}
+        )
+        monkeypatch.setattr(health, "_run_comprehensive_health", AsyncMock(return_value=report))
+        monkeypatch.setattr(health, "_report_cache", None)
+        monkeypatch.setattr(health, "_report_inflight", None)
+        monkeypatch.setattr(health, "_report_body", None)
+        monkeypatch.setattr(settings, "HEALTH_CHECK_CACHE_TTL", 60)
+        
+        first = await health.comprehensive_health_endpoint()
+        second = await health.comprehensive_health_endpoint()
+        
+        assert second.body is first.body
+        assert second.media_type == "application/json"
+        assert health.ComprehensiveHealthResponse.model_validate_json(second.body) == report
+    
+    @pytest.mark.asyncio
+    async def test_hung_check_reported_as_timeout(self, monkeypatch):
+        """Test that a check that never returns is cut off at the timeout."""
+        async def hung_check():
+            await asyncio.sleep(60)
+        
+        monkeypatch.setattr(settings, "HEALTH_CHECK_TIMEOUT", 0.01)
+        
+        result = await health._bounded("redis", hung_check())
+        
+        assert result.status == "unhealthy"
+        assert result.details["error"] == "timeout"
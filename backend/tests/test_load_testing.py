@@ -536,7 +536,7 @@ class TestMemoryAndResourceUsage:
             # Upload documents
             with open(list(test_files.values())[0], 'rb') as f:
                 files = {'file': (f'load_test_{i}.txt', f, 'text/plain')}
-                response = test_client.post("/api/v1/documents/upload", files=files)
+                response = await asyncio.to_thread(test_client.post, "/api/v1/documents/upload", files=files)
                 assert response.status_code == 200
             
             # Perform searches
@@ -555,7 +555,7 @@ class TestMemoryAndResourceUsage:
                 }
                 mock_rag_service.return_value = mock_service
                 
-                response = test_client.post("/api/v1/search", json=search_data)
+                response = await asyncio.to_thread(test_client.post, "/api/v1/search", json=search_data)
                 assert response.status_code == 200
         
         # Allow time for cleanup
@@ -599,7 +599,7 @@ class TestSystemStability:
                     # Upload
                     with open(list(test_files.values())[0], 'rb') as f:
                         files = {'file': (f'sustained_test_{len(results)}.txt', f, 'text/plain')}
-                        response = test_client.post("/api/v1/documents/upload", files=files)
+                        response = await asyncio.to_thread(test_client.post, "/api/v1/documents/upload", files=files)
                 else:
                     # Search
                     search_data = {
@@ -617,7 +617,7 @@ class TestSystemStability:
                         }
                         mock_rag_service.return_value = mock_service
                         
-                        response = test_client.post("/api/v1/search", json=search_data)
+                        response = await asyncio.to_thread(test_client.post, "/api/v1/search", json=search_data)
                 
                 results.append({
                     "timestamp": time.time(),
@@ -678,7 +678,7 @@ class TestSystemStability:
                         "mode": "hybrid"
                     }
                     
-                    response = test_client.post("/api/v1/search", json=search_data)
+                    response = await asyncio.to_thread(test_client.post, "/api/v1/search", json=search_data)
                     
                     results.append({
                         "request_id": i,
@@ -703,7 +703,7 @@ class TestSystemStability:
                         "mode": "hybrid"
                     }
                     
-                    response = test_client.post("/api/v1/search", json=search_data)
+                    response = await asyncio.to_thread(test_client.post, "/api/v1/search", json=search_data)
                     
                     results.append({
                         "request_id": i,
@@ -751,7 +751,7 @@ class TestPerformanceBenchmarks:
                 files = {'file': (filename, test_content.encode(), 'text/plain')}
                 
                 start_time = time.time()
-                response = test_client.post("/api/v1/documents/upload", files=files)
+                response = await asyncio.to_thread(test_client.post, "/api/v1/documents/upload", files=files)
                 end_time = time.time()
                 
                 if response.status_code == 200:
@@ -805,7 +805,7 @@ class TestPerformanceBenchmarks:
                 }
                 
                 start_time = time.time()
-                response = test_client.post("/api/v1/search", json=search_data)
+                response = await asyncio.to_thread(test_client.post, "/api/v1/search", json=search_data)
                 end_time = time.time()
                 
                 if response.status_code == 200:
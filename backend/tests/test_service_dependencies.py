@@ -17,7 +17,7 @@ from unittest.mock import Mock, patch, AsyncMock
 import redis.exceptions
 import celery.exceptions
 
-from app.api.endpoints.health import comprehensive_health
+from app.api.endpoints.health import clear_health_cache, comprehensive_health
 from app.services.document_processor import DocumentProcessor
 from app.services.rag_service import RAGService
 from app.models.database import Document
@@ -33,7 +33,7 @@ class TestSingleServiceFailures:
         with patch('redis.Redis') as mock_redis_class:
             # Redis fails
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             # Other services are healthy
@@ -166,7 +166,7 @@ class TestMultipleServiceFailures:
             
             # Both Redis and Celery fail
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             mock_celery.control.inspect.side_effect = celery.exceptions.WorkerLostError("No workers")
@@ -226,7 +226,7 @@ class TestMultipleServiceFailures:
             
             # Critical services fail
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             mock_exists.return_value = False
@@ -252,7 +252,7 @@ class TestMultipleServiceFailures:
             
             # All services fail
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             mock_celery.control.inspect.side_effect = celery.exceptions.WorkerLostError("No workers")
@@ -283,7 +283,7 @@ class TestCascadingFailures:
         with patch('redis.Redis') as mock_redis_class:
             # Redis fails
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             # Celery should also fail due to Redis dependency
@@ -349,7 +349,7 @@ class TestCascadingFailures:
                 }
                 mock_rag_service.return_value = mock_service
                 
-                response = test_client.post("/api/v1/search", json={
+                response = await asyncio.to_thread(test_client.post, "/api/v1/search", json={
                     "query": "test query",
                     "limit": 5,
                     "mode": "hybrid"
@@ -372,18 +372,19 @@ class TestServiceStartupDependencies:
         initialization_order = []
         
         # Mock service initialization to track order
-        original_redis_ping = mock_all_services["redis"].ping
+        redis_pipeline = mock_all_services["redis"].pipeline.return_value
+        original_redis_execute = redis_pipeline.execute
         original_celery_inspect = mock_all_services["celery"].control.inspect
         
         def track_redis_init():
             initialization_order.append("redis")
-            return original_redis_ping()
+            return original_redis_execute()
         
         def track_celery_init():
             initialization_order.append("celery")
             return original_celery_inspect()
         
-        mock_all_services["redis"].ping = track_redis_init
+        redis_pipeline.execute = track_redis_init
         mock_all_services["celery"].control.inspect = track_celery_init
         
         # Run health check which should initialize services
@@ -404,13 +405,13 @@ class TestServiceStartupDependencies:
             
             # Redis is down
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             # Celery should detect Redis dependency failure
             mock_celery.control.inspect.side_effect = Exception("Redis connection required")
             
-            response = test_client.get("/api/v1/health/celery")
+            response = await asyncio.to_thread(test_client.get, "/api/v1/health/celery")
             
             assert response.status_code == 200
             data = response.json()
@@ -427,20 +428,19 @@ class TestServiceRecoveryScenarios:
         # First check - Redis is down
         with patch('redis.Redis') as mock_redis_class:
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
-            response1 = test_client.get("/api/v1/health/redis")
+            response1 = await asyncio.to_thread(test_client.get, "/api/v1/health/redis")
             assert response1.json()["status"] == "unhealthy"
         
         # Second check - Redis recovers
         with patch('redis.Redis') as mock_redis_class:
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.return_value = True
-            mock_redis_instance.info.return_value = {"redis_version": "7.0.0"}
+            mock_redis_instance.pipeline.return_value.execute.return_value = [True, {"redis_version": "7.0.0"}, True, "test_value", 1]
             mock_redis_class.return_value = mock_redis_instance
             
-            response2 = test_client.get("/api/v1/health/redis")
+            response2 = await asyncio.to_thread(test_client.get, "/api/v1/health/redis")
             assert response2.json()["status"] == "healthy"
     
     @pytest.mark.asyncio
@@ -451,7 +451,7 @@ class TestServiceRecoveryScenarios:
              patch('app.core.celery_app.celery_app') as mock_celery:
             
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             mock_celery.control.inspect.side_effect = Exception("Cannot connect to Redis")
@@ -467,12 +467,12 @@ class TestServiceRecoveryScenarios:
             assert result1.services["celery"].status == "unhealthy"
         
         # Second check - Redis recovers, Celery should also recover
+        clear_health_cache()
         with patch('redis.Redis') as mock_redis_class, \
              patch('app.core.celery_app.celery_app') as mock_celery:
             
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.return_value = True
-            mock_redis_instance.info.return_value = {"redis_version": "7.0.0"}
+            mock_redis_instance.pipeline.return_value.execute.return_value = [True, {"redis_version": "7.0.0"}, True, "test_value", 1]
             mock_redis_class.return_value = mock_redis_instance
             
             mock_inspect = Mock()
@@ -499,8 +499,7 @@ class TestServiceRecoveryScenarios:
             
             # Redis recovers
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.return_value = True
-            mock_redis_instance.info.return_value = {"redis_version": "7.0.0"}
+            mock_redis_instance.pipeline.return_value.execute.return_value = [True, {"redis_version": "7.0.0"}, True, "test_value", 1]
             mock_redis_class.return_value = mock_redis_instance
             
             # OpenAI still down
@@ -536,7 +535,7 @@ class TestServiceDependencyMapping:
         with patch('redis.Redis') as mock_redis_class:
             # Redis fails
             mock_redis_instance = Mock()
-            mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+            mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
             mock_redis_class.return_value = mock_redis_instance
             
             with patch('app.core.config.settings') as mock_settings:
@@ -596,11 +595,11 @@ class TestServiceFailureImpactAnalysis:
                 # Configure failures based on scenario
                 if failures.get("redis"):
                     mock_redis_instance = Mock()
-                    mock_redis_instance.ping.side_effect = redis.exceptions.ConnectionError("Redis down")
+                    mock_redis_instance.pipeline.return_value.execute.side_effect = redis.exceptions.ConnectionError("Redis down")
                     mock_redis_class.return_value = mock_redis_instance
                 else:
                     mock_redis_instance = Mock()
-                    mock_redis_instance.ping.return_value = True
+                    mock_redis_instance.pipeline.return_value.execute.return_value = [True, {}, True, "test_value", 1]
                     mock_redis_class.return_value = mock_redis_instance
                 
                 if failures.get("celery"):
@@ -625,7 +624,7 @@ class TestServiceFailureImpactAnalysis:
                 # Test upload
                 with open(test_files['text'], 'rb') as f:
                     files = {'file': ('test.txt', f, 'text/plain')}
-                    response = test_client.post("/api/v1/documents/upload", files=files)
+                    response = await asyncio.to_thread(test_client.post, "/api/v1/documents/upload", files=files)
                 
                 # Analyze impact based on failure type
                 if failures.get("storage"):
@@ -664,7 +663,7 @@ class TestServiceFailureImpactAnalysis:
                 }
                 mock_rag_service.return_value = mock_service
                 
-                response = test_client.post("/api/v1/search", json=search_query)
+                response = await asyncio.to_thread(test_client.post, "/api/v1/search", json=search_query)
                 
                 # Should work in degraded mode
                 assert response.status_code == 200